@@ -1,39 +1,94 @@
 import psycopg2
+import psycopg2.pool
 import dotenv
 import os
+import threading
 from contextlib import contextmanager
 from pathlib import Path
 
 dotenv.load_dotenv()
 
+# Connections are pooled so short queries don't pay a connect + auth handshake each.
+# The pool is created on first use so importing this module never touches the DB
+POOL_MIN_CONNECTIONS = 2
+POOL_MAX_CONNECTIONS = 16
+
+_pool = None
+_pool_lock = threading.Lock()
+# ThreadedConnectionPool raises when exhausted; this makes callers wait instead
+_pool_slots = threading.BoundedSemaphore(POOL_MAX_CONNECTIONS)
+
+
+def _connection_params():
+    return dict(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+    )
+
+
 def get_connection():
     try:
-        conn = psycopg2.connect(
-            dbname=os.getenv("DB_NAME"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            host=os.getenv("DB_HOST"),
-            port=os.getenv("DB_PORT"),
-        )
+        conn = psycopg2.connect(**_connection_params())
         return conn
     except Exception as e:
         print(f"Database connection error: {str(e)}")
         raise
 
 
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                try:
+                    _pool = psycopg2.pool.ThreadedConnectionPool(
+                        POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS, **_connection_params()
+                    )
+                except Exception as e:
+                    print(f"Database connection error: {str(e)}")
+                    raise
+    return _pool
+
+
 @contextmanager
 def get_cursor():
-    connection = get_connection()
-    cursor = connection.cursor()
+    pool = get_pool()
+    _pool_slots.acquire()
+    try:
+        connection = pool.getconn()
+    except Exception:
+        _pool_slots.release()
+        raise
+    # A connection the server dropped is discarded rather than handed to the next caller
+    discard = False
+    try:
+        cursor = connection.cursor()
+    except Exception:
+        # Otherwise both the connection and its slot would be lost for good
+        try:
+            pool.putconn(connection, close=True)
+        finally:
+            _pool_slots.release()
+        raise
     try:
         yield cursor
         connection.commit()
     except Exception as e:
-        connection.rollback()
+        if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+            discard = True
+        if not connection.closed:
+            connection.rollback()
         raise e
     finally:
-        cursor.close()
-        connection.close()
+        try:
+            if not cursor.closed:
+                cursor.close()
+            pool.putconn(connection, close=discard or bool(connection.closed))
+        finally:
+            _pool_slots.release()
 
 
 def init_db():
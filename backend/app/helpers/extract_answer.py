@@ -1,21 +1,27 @@
 import re
 
+# Compiled once, this runs for every evaluated response
+_ANSWER_SECTION_RE = re.compile(r"## Answer\s*(.*?)(?=\s*##|$)", re.DOTALL)
+_ANSWER_LIKE_SECTION_RE = re.compile(
+    r"(?:###|##)\s*(?:Answer|Key Details.*?)\s*(.*?)(?=\s*(?:###|##)|$)", re.DOTALL
+)
+_SUBHEADER_RE = re.compile(r"^###\s*.*?\n", re.MULTILINE)
+
 def extract_answer_for_evaluation(response):
     """Extract the answer from the model's response for evaluation purposes."""
     
-    # Extract the answer section using regex - get the LAST answer section
-    answer_sections = re.findall(
-        r"## Answer\s*(.*?)(?=\s*##|$)", response, re.DOTALL
-    )
-    if answer_sections:
-        clean_answer = answer_sections[-1].strip()  # Use the last answer section
+    # Extract the answer section using regex - get the LAST answer section.
+    # A section ends at the next "##", so the last one starts at the last "## Answer"
+    last_answer_start = response.rfind("## Answer")
+    if last_answer_start != -1:
+        clean_answer = _ANSWER_SECTION_RE.match(response, last_answer_start).group(1).strip()
     else:
         # Check if there's an "Agent Reasoning and Response:" prefix
         if "Agent Reasoning and Response:" in response:
             response = response.split("Agent Reasoning and Response:")[1].strip()
         
         # Try to find any section that looks like an answer
-        answer_match = re.search(r"(?:###|##)\s*(?:Answer|Key Details.*?)\s*(.*?)(?=\s*(?:###|##)|$)", response, re.DOTALL)
+        answer_match = _ANSWER_LIKE_SECTION_RE.search(response)
         if answer_match:
             clean_answer = answer_match.group(1).strip()
         else:
@@ -24,7 +30,7 @@ def extract_answer_for_evaluation(response):
             clean_answer = parts[-1].strip() if len(parts) > 1 else response.strip()
     
     # Remove any remaining markdown headers
-    clean_answer = re.sub(r"^###\s*.*?\n", "", clean_answer, flags=re.MULTILINE)
+    clean_answer = _SUBHEADER_RE.sub("", clean_answer)
     
     # If we still don't have a clean answer, return an empty string
     if not clean_answer or clean_answer.isspace():
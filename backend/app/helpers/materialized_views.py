@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from agno.utils.log import logger
+from app.conf.postgres import get_cursor
+
+# Materialized views are refreshed when they are read after results were saved,
+# instead of by triggers on every INSERT. A test run saves several rows per test,
+# and each trigger refresh re-ran the full aggregation over all stored results.
+# Writes made by other processes are looked for once the refresh is this old
+MAX_VIEW_AGE_SECONDS = float(os.getenv("MATERIALIZED_VIEW_MAX_AGE_SECONDS", "300"))
+
+# Wait after a failed refresh before trying again; readers get the current view meanwhile
+REFRESH_RETRY_SECONDS = 30.0
+
+# Both views have a unique index, so they are refreshed CONCURRENTLY and never
+# block readers. That only fails on a view that was never populated (WITH NO DATA)
+_VIEWS = ("full_query_data", "model_performance_metrics")
+
+# Every save inserts one query_evaluation row in the same transaction as the
+# rows the views are built from, so its highest id tells whether anything changed
+_WATERMARK_QUERY = "SELECT COALESCE(MAX(id), 0) FROM public.query_evaluation"
+
+_lock = threading.Lock()
+_stale = False
+# Unknown at startup, so the first read compares the watermark and refreshes
+_watermark = None
+_last_check = 0.0
+_retry_at = 0.0
+# Bumped on every refresh, so readers can cache view rows until it changes
+_generation = 0
+
+
+def mark_views_stale() -> None:
+    """Note that rows the materialized views are built from have changed."""
+    global _stale
+    _stale = True
+
+
+def _refresh_view(name: str) -> None:
+    try:
+        with get_cursor() as cursor:
+            cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY public.{name}")
+        return
+    except Exception as e:
+        logger.warning(f"Could not refresh materialized view {name} concurrently: {e}")
+    with get_cursor() as cursor:
+        cursor.execute(f"REFRESH MATERIALIZED VIEW public.{name}")
+
+
+def _read_watermark() -> int:
+    with get_cursor() as cursor:
+        cursor.execute(_WATERMARK_QUERY)
+        return cursor.fetchone()[0]
+
+
+def refresh_views_if_stale() -> None:
+    """Refresh the materialized views if results were saved since the last refresh.
+
+    Never raises: if the refresh fails, or another thread is already refreshing,
+    callers read the views as they are.
+    """
+    global _stale, _watermark, _last_check, _retry_at, _generation
+    now = time.monotonic()
+    if now < _retry_at:
+        return
+    if not _stale and now - _last_check < MAX_VIEW_AGE_SECONDS:
+        return
+    # A refresh in progress already serves this read's purpose
+    if not _lock.acquire(blocking=False):
+        return
+    try:
+        # Cleared before refreshing so a save made during the refresh marks it again
+        was_stale, _stale = _stale, False
+        watermark = _read_watermark()
+        if was_stale or watermark != _watermark:
+            for name in _VIEWS:
+                _refresh_view(name)
+            _generation += 1
+        _watermark = watermark
+        _last_check = time.monotonic()
+    except Exception as e:
+        _stale = True
+        _retry_at = time.monotonic() + REFRESH_RETRY_SECONDS
+        logger.error(f"Refreshing materialized views failed, serving current data: {e}")
+    finally:
+        _lock.release()
+
+
+def views_generation() -> int:
+    """Number of refreshes done by this process; view contents only change with it."""
+    return _generation
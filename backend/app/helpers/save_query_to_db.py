@@ -1,18 +1,41 @@
 from typing import Dict, Optional, List, Union, Tuple, Any
 from agno.utils.log import logger
 from app.conf.postgres import get_cursor
+from app.helpers.materialized_views import mark_views_stale
 import ast
 import json
 import logging
+import threading
 
+# llm_models rarely changes, so name -> id lookups are memoized for the process lifetime
+_MODEL_ID_CACHE: Dict[str, int] = {}
+_model_id_cache_lock = threading.Lock()
 
-def get_model_id(llm_model_name: str) -> int:
-    with get_cursor() as cursor:
-        cursor.execute("SELECT id FROM llm_models WHERE name = %s", (llm_model_name,))
-        result = cursor.fetchone()
-        if result is None:
-            raise ValueError(f"No model found with name: {llm_model_name}")
-        return result[0]
+
+def invalidate_model_cache() -> None:
+    """Forget cached model ids, e.g. after models were added or renamed."""
+    with _model_id_cache_lock:
+        _MODEL_ID_CACHE.clear()
+
+
+def get_model_id(llm_model_name: str, cursor=None) -> int:
+    with _model_id_cache_lock:
+        model_id = _MODEL_ID_CACHE.get(llm_model_name)
+    if model_id is not None:
+        return model_id
+
+    if cursor is None:
+        with get_cursor() as cursor:
+            return get_model_id(llm_model_name, cursor)
+
+    cursor.execute("SELECT id FROM llm_models WHERE name = %s", (llm_model_name,))
+    result = cursor.fetchone()
+    if result is None:
+        raise ValueError(f"No model found with name: {llm_model_name}")
+
+    with _model_id_cache_lock:
+        _MODEL_ID_CACHE[llm_model_name] = result[0]
+    return result[0]
 
 
 def save_query_to_db(
@@ -31,11 +54,11 @@ def save_query_to_db(
     """
     # Convert Python structures to JSON strings for PostgreSQL
     
-    # Get numeric model ID from name
-    model_id = get_model_id(llm_model_id)
-    
     with get_cursor() as cursor:
         try:
+            # Get numeric model ID from name
+            model_id = get_model_id(llm_model_id, cursor)
+            
             cursor.execute(
                 """
                 INSERT INTO query_result (query, direct_response, full_response, llm_model_id, sql_queries, test_no)
@@ -62,12 +85,14 @@ def save_query_to_db(
                     (prompt_tokens, completion_tokens, total_tokens, query_result_id),
                 )
             
-            return query_result_id
-            
         except Exception as e:
             logger.error(f"Error saving query to database: {e}")
             raise
 
+    # Only once committed, so a refresh can't run before the rows are visible
+    mark_views_stale()
+    return query_result_id
+
 
 def create_query_result_for_eval(
     query: str,
@@ -77,36 +102,49 @@ def create_query_result_for_eval(
     sql_queries: Optional[List[str]] = None,
     test_no: Optional[int] = None,
     tool_calls: Optional[str] = None,
+    cursor=None,
 ) -> int:
     """Create a query_result record for evaluation purposes.
     
+    Args:
+        cursor: Optional cursor to insert with, making the insert part of the
+            caller's transaction. A new transaction is used if not given.
+    
     Returns:
         int: The ID of the inserted query_result record
     """
+    if cursor is None:
+        with get_cursor() as cursor:
+            query_result_id = create_query_result_for_eval(
+                query, direct_response, full_response, llm_model_id,
+                sql_queries, test_no, tool_calls, cursor=cursor,
+            )
+        mark_views_stale()
+        return query_result_id
+
     # Convert Python structures to JSON strings for PostgreSQL
     sql_queries_json = json.dumps(sql_queries) if sql_queries else None
     
     # Get numeric model ID from name
-    model_id = get_model_id(llm_model_id)
+    model_id = get_model_id(llm_model_id, cursor)
     
-    with get_cursor() as cursor:
-        try:
-            cursor.execute(
-                """
-                INSERT INTO query_result (query, direct_response, full_response, llm_model_id, sql_queries, test_no, tool_calls)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-                """,
-                (query, direct_response, full_response, model_id, sql_queries_json, test_no, tool_calls),
-            )
-            
-            # Get the ID of the inserted record
-            query_result_id = cursor.fetchone()[0]
-            return query_result_id
-            
-        except Exception as e:
-            logger.error(f"Error creating query_result record: {e}")
-            raise
+    try:
+        cursor.execute(
+            """
+            INSERT INTO query_result (query, direct_response, full_response, llm_model_id, sql_queries, test_no, tool_calls)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+            """,
+            (query, direct_response, full_response, model_id, sql_queries_json, test_no, tool_calls),
+        )
+        
+        # Get the ID of the inserted record
+        query_result_id = cursor.fetchone()[0]
+        return query_result_id
+        
+    except Exception as e:
+        logger.error(f"Error creating query_result record: {e}")
+        raise
 
 
 def save_query_with_eval_to_db(
@@ -170,15 +208,18 @@ def save_query_with_eval_to_db(
     # Log the processed evaluation results for debugging
     print(f"DEBUG - Processed evaluation results for DB: {processed_results}")
 
-    # Use existing query_result_id if provided, otherwise create a new record
-    query_result_id = existing_query_result_id
-    if query_result_id is None:
-        query_result_id = create_query_result_for_eval(
-            query, direct_response, full_response, llm_model_id, sql_queries, test_no, tool_calls
-        )
-
+    # The query_result, metrics, evaluation and token usage rows are written in one
+    # transaction, so a failed save leaves no partial records behind
     with get_cursor() as cursor:
         try:
+            # Use existing query_result_id if provided, otherwise create a new record
+            query_result_id = existing_query_result_id
+            if query_result_id is None:
+                query_result_id = create_query_result_for_eval(
+                    query, direct_response, full_response, llm_model_id,
+                    sql_queries, test_no, tool_calls, cursor=cursor,
+                )
+
             # Insert evaluation metrics record
             insert_values = (
                 processed_results.get("factual_correctness"),
@@ -194,30 +235,26 @@ def save_query_with_eval_to_db(
             # Print actual values being inserted for debugging
             print(f"DEBUG - DB insert values: {insert_values}")
             
+            # Insert the metrics and the query_evaluation referencing them in one statement
             cursor.execute(
                 """
-                INSERT INTO evaluation_metrics (
-                    factual_correctness, semantic_similarity, context_recall, 
-                    faithfulness, bleu_score, non_llm_string_similarity,
-                    rogue_score, string_present
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
-                """,
-                insert_values
-            )
-            evaluation_metrics_id = cursor.fetchone()[0]
-            
-            # Then insert into query_evaluation
-            cursor.execute(
-                """
+                WITH em AS (
+                    INSERT INTO evaluation_metrics (
+                        factual_correctness, semantic_similarity, context_recall, 
+                        faithfulness, bleu_score, non_llm_string_similarity,
+                        rogue_score, string_present
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
+                )
                 INSERT INTO query_evaluation (
                     retrieved_contexts, ground_truth, query_result_id, evaluation_metrics_id
-                ) VALUES (%s, %s, %s, %s) RETURNING id
+                )
+                SELECT %s, %s, %s, em.id FROM em
+                RETURNING id
                 """,
-                (
+                insert_values + (
                     processed_results.get("retrieved_contexts"),
                     processed_results.get("ground_truth"),
                     query_result_id,
-                    evaluation_metrics_id,
                 ),
             )
             query_evaluation_id = cursor.fetchone()[0]
@@ -235,8 +272,10 @@ def save_query_with_eval_to_db(
                     """,
                     (prompt_tokens, completion_tokens, total_tokens, query_result_id),
                 )
-                
-            return query_evaluation_id
         except Exception as e:
             logger.error(f"Error saving evaluation results to database: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    # Only once committed, so a refresh can't run before the rows are visible
+    mark_views_stale()
+    return query_evaluation_id
\ No newline at end of file
@@ -3,10 +3,35 @@ import typing as t
 import os
 from dataclasses import dataclass, field
 import json
-import aiohttp
+import asyncio
+import functools
+import re
+import httpx
 from ragas.dataset_schema import SingleTurnSample
 from ragas.metrics.base import SingleTurnMetric, MetricType
 
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+_NON_NUMERIC_RE = re.compile(r'[^\d.]')
+
+# Shared client so every extraction call reuses pooled keep-alive connections
+# (multiplexed over HTTP/2) instead of paying a TCP + TLS handshake per test.
+# It is synchronous on purpose: RAGAS runs each evaluate() in a fresh event loop,
+# and an async client's connections can't outlive the loop that opened them.
+HTTP = httpx.Client(
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=128, max_keepalive_connections=64, keepalive_expiry=60.0),
+    ),
+    timeout=httpx.Timeout(60, connect=5),
+)
+
+@functools.lru_cache(maxsize=1)
+def _get_openrouter_api_key() -> t.Optional[str]:
+    """Read the OpenRouter key once; callers run after load_dotenv()"""
+    return os.environ.get("OPENROUTER_API_KEY")
+
 @dataclass
 class LenientFactualCorrectness(SingleTurnMetric):
     name: str = "lenient_factual_correctness"
@@ -23,7 +48,7 @@ class LenientFactualCorrectness(SingleTurnMetric):
     def init(self, run_config=None) -> None:
         """Initialize the API key for OpenRouter."""
         # Get API key from environment
-        self.api_key = os.environ.get("OPENROUTER_API_KEY")
+        self.api_key = _get_openrouter_api_key()
         if not self.api_key:
             raise ValueError("OPENROUTER_API_KEY not found in environment variables")
         
@@ -118,33 +143,30 @@ class LenientFactualCorrectness(SingleTurnMetric):
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post("https://openrouter.ai/api/v1/chat/completions", 
-                                      headers=headers, json=payload) as response:
-                    if response.status != 200:
-                        print(f"Error from OpenRouter: {await response.text()}")
-                        return None
-                    
-                    data = await response.json()
-                    extracted = data["choices"][0]["message"]["content"].strip()
-                    
-                    # Handle "None" response
-                    if extracted.lower() == "none":
-                        return None
-                        
-                    # Clean up the extracted text - strip any markdown or formatting
-                    import re
-                    # Remove all non-numeric characters except decimal point
-                    clean_extracted = re.sub(r'[^\d.]', '', extracted)
-                    
-                    print(f"Extracted number: '{extracted}' -> Cleaned: '{clean_extracted}'")
-                    
-                    # Try to convert to float
-                    try:
-                        return float(clean_extracted)
-                    except ValueError:
-                        print(f"Failed to extract number from: '{extracted}' -> '{clean_extracted}'")
-                        return None
+            response = await asyncio.to_thread(HTTP.post, OPENROUTER_URL, headers=headers, json=payload)
+            if response.status_code != 200:
+                print(f"Error from OpenRouter: {response.text}")
+                return None
+            
+            data = response.json()
+            extracted = data["choices"][0]["message"]["content"].strip()
+            
+            # Handle "None" response
+            if extracted.lower() == "none":
+                return None
+                
+            # Clean up the extracted text - strip any markdown or formatting
+            # Remove all non-numeric characters except decimal point
+            clean_extracted = _NON_NUMERIC_RE.sub('', extracted)
+            
+            print(f"Extracted number: '{extracted}' -> Cleaned: '{clean_extracted}'")
+            
+            # Try to convert to float
+            try:
+                return float(clean_extracted)
+            except ValueError:
+                print(f"Failed to extract number from: '{extracted}' -> '{clean_extracted}'")
+                return None
                     
         except Exception as e:
             print(f"Error extracting number: {e}")
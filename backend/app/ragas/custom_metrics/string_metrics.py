@@ -0,0 +1,133 @@
+import functools
+import typing as t
+import numpy as np
+from numba import njit
+from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
+from rapidfuzz.distance import Levenshtein
+from rouge_score.tokenizers import DefaultTokenizer
+
+# Metric names match the keys RAGAS produced for BleuScore, NonLLMStringSimilarity,
+# RougeScore and StringPresence so downstream code and the DB columns are unchanged
+BLEU_SCORE = "bleu_score"
+NON_LLM_STRING_SIMILARITY = "non_llm_string_similarity"
+ROUGE_SCORE = "rouge_score(mode=fmeasure)"
+STRING_PRESENT = "string_present"
+
+_rouge_tokenizer = DefaultTokenizer(use_stemmer=True)
+_bleu_smoothing = SmoothingFunction().method1
+
+
+@njit(cache=True)
+def _lcs_length(a: np.ndarray, b: np.ndarray) -> int:
+    """Length of the longest common subsequence of two int32 token arrays."""
+    n = b.shape[0]
+    prev = np.zeros(n + 1, dtype=np.int32)
+    curr = np.zeros(n + 1, dtype=np.int32)
+    for i in range(a.shape[0]):
+        for j in range(n):
+            if a[i] == b[j]:
+                curr[j + 1] = prev[j] + 1
+            elif curr[j] > prev[j + 1]:
+                curr[j + 1] = curr[j]
+            else:
+                curr[j + 1] = prev[j + 1]
+        prev, curr = curr, prev
+    return prev[n]
+
+
+@functools.lru_cache(maxsize=4096)
+def _tokenize(text: str) -> t.Tuple[str, ...]:
+    """Stemmed ROUGE tokens for a text, cached across metrics and replicate runs."""
+    return tuple(_rouge_tokenizer.tokenize(text))
+
+
+@functools.lru_cache(maxsize=4096)
+def _whitespace_tokens(text: str) -> t.Tuple[str, ...]:
+    """Whitespace tokens used for BLEU, cached like _tokenize."""
+    return tuple(text.split())
+
+
+def pretokenize(texts: t.Iterable[str]) -> None:
+    """Warm the tokenization caches, e.g. with all ground truths of a test set."""
+    for text in texts:
+        if text:
+            _tokenize(text)
+            _whitespace_tokens(text)
+
+
+def _to_ids(tokens: t.Sequence[str], vocab: t.Dict[str, int]) -> np.ndarray:
+    """Map tokens to a contiguous int32 array using a shared vocabulary."""
+    return np.fromiter(
+        (vocab.setdefault(token, len(vocab)) for token in tokens),
+        dtype=np.int32,
+        count=len(tokens),
+    )
+
+
+def _bleu(reference: str, response: str) -> float:
+    """Same scoring as the BleuScore metric: whitespace tokens, 4-gram, smoothed."""
+    if not reference or not response:
+        return 0.0
+    return float(
+        sentence_bleu(
+            [list(_whitespace_tokens(reference))],
+            list(_whitespace_tokens(response)),
+            weights=(0.25, 0.25, 0.25, 0.25),
+            smoothing_function=_bleu_smoothing,
+        )
+    )
+
+
+def _rouge_l(reference_ids: np.ndarray, response_ids: np.ndarray) -> float:
+    """ROUGE-L F-measure, equivalent to rouge_score's rougeL with stemming."""
+    if reference_ids.shape[0] == 0 or response_ids.shape[0] == 0:
+        return 0.0
+    lcs = _lcs_length(reference_ids, response_ids)
+    if lcs == 0:
+        return 0.0
+    precision = lcs / response_ids.shape[0]
+    recall = lcs / reference_ids.shape[0]
+    return 2 * precision * recall / (precision + recall)
+
+
+def fast_metrics_batch(refs: t.List[str], hyps: t.List[str]) -> t.Dict[str, np.ndarray]:
+    """
+    Compute the non-LLM string metrics for a whole batch in one pass.
+
+    Replaces running BleuScore, NonLLMStringSimilarity, RougeScore and StringPresence
+    through RAGAS's per-sample interface.
+
+    Args:
+        refs: Reference answers (ground truths)
+        hyps: Model responses, aligned with refs
+
+    Returns:
+        Dict mapping metric name to a float64 array with one score per row
+    """
+    if len(refs) != len(hyps):
+        raise ValueError("refs and hyps must have the same length")
+
+    n = len(refs)
+    bleu = np.empty(n, dtype=np.float64)
+    similarity = np.empty(n, dtype=np.float64)
+    rouge = np.empty(n, dtype=np.float64)
+    present = np.empty(n, dtype=np.float64)
+
+    vocab: t.Dict[str, int] = {}
+    for i, (reference, response) in enumerate(zip(refs, hyps)):
+        reference = reference or ""
+        response = response or ""
+        bleu[i] = _bleu(reference, response)
+        similarity[i] = Levenshtein.normalized_similarity(reference, response)
+        rouge[i] = _rouge_l(
+            _to_ids(_tokenize(reference), vocab),
+            _to_ids(_tokenize(response), vocab),
+        )
+        present[i] = float(reference in response)
+
+    return {
+        BLEU_SCORE: bleu,
+        NON_LLM_STRING_SIMILARITY: similarity,
+        ROUGE_SCORE: rouge,
+        STRING_PRESENT: present,
+    }
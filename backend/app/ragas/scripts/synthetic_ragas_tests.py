@@ -1,12 +1,10 @@
 import pandas as pd
-import json
-from ragas import evaluate, EvaluationDataset
+import numpy as np
+import orjson
+from ragas import evaluate, EvaluationDataset, RunConfig
 from ragas.metrics import LLMContextRecall, Faithfulness, SemanticSimilarity
 
 # from ragas.dataset_schema import SingleTurnSample
-from ragas.metrics._string import NonLLMStringSimilarity
-from ragas.metrics import RougeScore
-from ragas.metrics import StringPresence
 from ragas.llms import LangchainLLMWrapper
 from ragas.embeddings import LangchainEmbeddingsWrapper
 from langchain_openai import ChatOpenAI
@@ -16,13 +14,19 @@ import os
 from dotenv import load_dotenv
 from pathlib import Path
 import datetime
+import threading
+import functools
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from app.ragas.custom_metrics.LenientFactualCorrectness import LenientFactualCorrectness
-from app.ragas.custom_metrics.bleu_score import BleuScore
+from app.ragas.custom_metrics.string_metrics import fast_metrics_batch, pretokenize
+from app.ragas.utils.embeddings import CachingEmbeddings, LocalSentenceEmbeddings
 import argparse
 from typing import Callable, Optional, Tuple, Union, List, Dict, Any
 import re
 from app.helpers.extract_answer import extract_answer_for_evaluation
+from app.services.query_with_eval import process_query_internal
 import logging
 
 
@@ -37,6 +41,36 @@ DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Embed with a local sentence-transformers model instead of the OpenAI API
+USE_LOCAL_EMBEDDINGS = os.getenv("USE_LOCAL_EMBEDDINGS", "").lower() in ("1", "true", "yes")
+
+# Failures are appended as one JSON object per line
+JSON_DUMP_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+
+# Resolved from this file so loading doesn't depend on the working directory
+_TEST_CASES_PATH = Path(__file__).parent.parent / "test_cases" / "synthetic_test_cases.json"
+
+# Created by _append_failure on the first failure written to them
+FAILED_TESTS_DIR = Path(__file__).parent.parent / "failed_tests"
+RAGAS_FAILED_DIR = Path(__file__).parent.parent / "ragas_eval_failed"
+
+# Embeddings of ground truths, reused across runs of the test set
+EMBEDDINGS_CACHE_PATH = Path(__file__).parent.parent / ".emb_cache.json"
+
+# One open append-only JSONL file per failure directory and run
+_failure_logs = {}
+_failure_logs_lock = threading.Lock()
+
+# Uploads to the RAGAS app don't affect the results, so they run off the main path.
+# Pending uploads are finished before the interpreter exits
+_upload_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ragas-upload")
+atexit.register(_upload_pool.shutdown, wait=True)
+
+# Markers of a SQL or processing error in the agent's full response
+_ERR_RE = re.compile(
+    r"Error processing query|'NoneType' object is not subscriptable|TypeError:|KeyError:|IndexError:"
+)
+
 # Initialize LLM and Embeddings wrappers
 if DEEPSEEK_API_KEY:
     print("Using DeepSeek API key")
@@ -47,7 +81,21 @@ if not DEEPSEEK_API_KEY:
     print("Using OpenAI API key")
     evaluator_llm = LangchainLLMWrapper(ChatOpenAI(model="gpt-4o"))
 
-evaluator_embeddings = LangchainEmbeddingsWrapper(OpenAIEmbeddings())
+if USE_LOCAL_EMBEDDINGS:
+    print("Using local sentence-transformers embeddings")
+    evaluator_embeddings = CachingEmbeddings(LocalSentenceEmbeddings(), cache_path=EMBEDDINGS_CACHE_PATH)
+else:
+    evaluator_embeddings = CachingEmbeddings(OpenAIEmbeddings(), cache_path=EMBEDDINGS_CACHE_PATH)
+
+# RAGAS metrics shared by every evaluation. The string metrics are computed
+# separately by combined_scores
+_METRICS = [
+    LenientFactualCorrectness(),
+    SemanticSimilarity(embeddings=evaluator_embeddings),
+    # LLMContextRecall(llm=evaluator_llm),
+    Faithfulness(llm=evaluator_llm),
+]
+_LFC = _METRICS[0]
 
 
 def run_test_case(query: str, llm_model_id: str, test_no: Optional[str] = None) -> Tuple[str, Union[List[str], str], bool, Optional[Dict[str, int]], Optional[str]]:
@@ -66,38 +114,29 @@ def run_test_case(query: str, llm_model_id: str, test_no: Optional[str] = None)
         - token_usage: Dictionary with token usage statistics or None if unavailable
         - tool_calls: String representation of tool calls or None if unavailable
     """
-    print(f"DEBUG: Entered run_test_case for query: {query[:50]}...")
-    
-    # Import process_query_internal inside the function to avoid circular imports
-    from app.services.query_with_eval import process_query_internal
+    logger.debug("Entered run_test_case for query: %.50s...", query)
     
     try:
         # Directly call the internal processing function instead of making an API call
-        print(f"DEBUG: About to call process_query_internal")
+        logger.debug("About to call process_query_internal")
         result = process_query_internal(
             question=query,
             source_file="ferry_trips_data.csv", 
             llm_model_id=llm_model_id,
             save_to_db=False  # Don't save this to DB, we'll do it ourselves later
         )
-        print(f"DEBUG: process_query_internal returned: {result}")
+        logger.debug("process_query_internal returned: %r", result)
         
         agent_response = result.get("content")
         full_response = result.get("full_response", "")
         sql_queries = result.get("sql_queries", [])
         token_usage = result.get("token_usage")
         tool_calls = result.get("tool_calls")  # Get tool_calls instead of response_object
-        print(f"DEBUG: tool_calls from result: {tool_calls}")
-        print(f"DEBUG: tool_calls type: {type(tool_calls)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("tool_calls from result: %r (type %s)", tool_calls, type(tool_calls).__name__)
 
         # Check for SQL errors in the response
-        if (
-            "Error processing query" in full_response or 
-            "'NoneType' object is not subscriptable" in full_response or
-            "TypeError:" in full_response or
-            "KeyError:" in full_response or
-            "IndexError:" in full_response
-        ):
+        if _ERR_RE.search(full_response):
             error_message = f"SQL or processing error detected: {full_response}"
             logger.error(error_message)
             return error_message, full_response, False, token_usage, tool_calls
@@ -108,12 +147,10 @@ def run_test_case(query: str, llm_model_id: str, test_no: Optional[str] = None)
             return error_message, full_response, False, token_usage, tool_calls
 
         # Format contexts including SQL queries and full response
-        contexts = []
-        for sql in sql_queries:
-            contexts.append(f"SQL Query: {sql}")
+        contexts = [f"SQL Query: {sql}" for sql in sql_queries]
         contexts.append(f"Agent Reasoning and Response: {full_response}")
 
-        print(f"DEBUG: Returning from run_test_case with tool_calls: {tool_calls}")
+        logger.debug("Returning from run_test_case with tool_calls: %r", tool_calls)
         return agent_response, contexts, True, token_usage, tool_calls
 
     except Exception as e:
@@ -122,152 +159,357 @@ def run_test_case(query: str, llm_model_id: str, test_no: Optional[str] = None)
         return error_message, str(e), False, None, None
 
 
+def parse_extracted_true_values(test_cases):
+    """Store each test case's extracted_true_value as a float under _extracted_true_float
+
+    Done once when test cases are loaded so evaluation doesn't parse it per run.
+    Missing or unparseable values are stored as None.
+    """
+    for test_case in test_cases:
+        value = test_case.get("extracted_true_value")
+        extracted_float = None
+        if value is not None and value != "":
+            try:
+                extracted_float = float(value)
+            except (ValueError, TypeError) as e:
+                print(f"Error converting extracted_true_value to float: {e}")
+        # Test cases coming from a DataFrame use NaN for missing values
+        if extracted_float is not None and np.isnan(extracted_float):
+            extracted_float = None
+        test_case["_extracted_true_float"] = extracted_float
+    return test_cases
+
+
+@functools.lru_cache(maxsize=4)
+def _load_test_cases_cached(path, mtime_ns):
+    """Parse and prepare a test case file; keyed on mtime so edits are picked up"""
+    test_cases = orjson.loads(Path(path).read_bytes())
+    # Ground truths are scored against every response, tokenize them once up front
+    pretokenize(test_case.get("ground_truth") for test_case in test_cases)
+    return parse_extracted_true_values(test_cases)
+
+
 def load_synthetic_test_cases():
     """Load synthetic test cases from JSON file"""
-    test_cases_path = Path("app/ragas/test_cases/synthetic_test_cases.json")
     try:
-        with open(test_cases_path, "r") as f:
-            test_cases = json.load(f)
-        return test_cases
+        test_cases = _load_test_cases_cached(
+            str(_TEST_CASES_PATH), _TEST_CASES_PATH.stat().st_mtime_ns
+        )
+        # Callers may filter or annotate the test cases, so they get their own copies
+        return [dict(test_case) for test_case in test_cases]
     except FileNotFoundError:
-        print(f"Error: {test_cases_path} not found.")
+        print(f"Error: {_TEST_CASES_PATH} not found.")
         return None
-    except json.JSONDecodeError:
-        print(f"Error: Invalid JSON format in {test_cases_path}.")
+    except orjson.JSONDecodeError:
+        print(f"Error: Invalid JSON format in {_TEST_CASES_PATH}.")
         return None
 
 
-def save_failed_test(test_case, llm_model_id, error_response=None):
-    """Save tests that resulted in a 500 status code to a file"""
+def make_run_timestamp():
+    """Timestamp naming the failure files written during one evaluation run"""
+    return datetime.datetime.now().isoformat(timespec="seconds").replace(":", "")
 
-    # Create output directory if it doesn't exist
-    output_dir = os.path.join("app", "ragas", "failed_tests")
-    os.makedirs(output_dir, exist_ok=True)
 
-    # Create a filename with timestamp and test number
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    test_no = test_case.get("test_no", "unknown")
-    filename = f"failed_test_{test_no}_{timestamp}.json"
-    filepath = os.path.join(output_dir, filename)
+def _append_failure(directory, timestamp, record):
+    """Append a failure record to the run's JSONL file in directory, returning its path"""
+    filepath = directory / f"run_{timestamp}.jsonl"
+    line = orjson.dumps(record, option=JSON_DUMP_OPTIONS)
+    with _failure_logs_lock:
+        failure_log = _failure_logs.get(filepath)
+        if failure_log is None:
+            directory.mkdir(parents=True, exist_ok=True)
+            failure_log = _failure_logs[filepath] = open(filepath, "ab", buffering=1 << 16)
+        failure_log.write(line)
+    return str(filepath)
 
-    # Prepare data to save
-    failed_test_data = {
-        "test_case": test_case,
-        "model_id": llm_model_id,
-        "error": str(error_response),
-        "timestamp": timestamp,
-    }
 
-    # Save to file
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(failed_test_data, f, indent=2, ensure_ascii=False)
+def close_failure_logs():
+    """Flush and close the failure files written so far, e.g. at the end of a run"""
+    with _failure_logs_lock:
+        for failure_log in _failure_logs.values():
+            failure_log.close()
+        _failure_logs.clear()
 
-    print(f"Saved failed test to {filepath}")
-    return filepath
 
+atexit.register(close_failure_logs)
 
-def save_ragas_failed_test(test_case, llm_model_id, response, context, error=None):
-    """Save tests where RAGAS evaluation failed"""
 
-    # Create output directory if it doesn't exist
-    output_dir = os.path.join("app", "ragas", "ragas_eval_failed")
-    os.makedirs(output_dir, exist_ok=True)
+def save_failed_test(test_case, llm_model_id, error_response=None, run_timestamp=None):
+    """Save tests that resulted in a 500 status code to the run's failure file"""
+    timestamp = run_timestamp or make_run_timestamp()
+    filepath = _append_failure(
+        FAILED_TESTS_DIR,
+        timestamp,
+        {
+            "test_case": test_case,
+            "model_id": llm_model_id,
+            "error": str(error_response),
+            "timestamp": timestamp,
+        },
+    )
 
-    # Create a filename with timestamp and test number
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    test_no = test_case.get("test_no", "unknown")
-    filename = f"ragas_eval_failed_{test_no}_{timestamp}.json"
-    filepath = os.path.join(output_dir, filename)
+    print(f"Saved failed test {test_case.get('test_no', 'unknown')} to {filepath}")
+    return filepath
 
-    # Prepare data to save
-    failed_data = {
-        "test_case": test_case,
-        "model_id": llm_model_id,
-        "response": response,
-        "context": context,
-        "error": str(error),
-        "timestamp": timestamp,
-    }
 
-    # Save to file
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(failed_data, f, indent=2, ensure_ascii=False)
+def save_ragas_failed_test(test_case, llm_model_id, response, context, error=None, run_timestamp=None):
+    """Save tests where RAGAS evaluation failed to the run's failure file"""
+    timestamp = run_timestamp or make_run_timestamp()
+    filepath = _append_failure(
+        RAGAS_FAILED_DIR,
+        timestamp,
+        {
+            "test_case": test_case,
+            "model_id": llm_model_id,
+            "response": response,
+            "context": context,
+            "error": str(error),
+            "timestamp": timestamp,
+        },
+    )
 
-    print(f"Saved RAGAS evaluation failure to {filepath}")
+    print(f"Saved RAGAS evaluation failure for test {test_case.get('test_no', 'unknown')} to {filepath}")
     return filepath
 
 
+def _log_upload_failure(future):
+    if future.exception() is not None:
+        logger.error(f"Uploading results to RAGAS app failed: {future.exception()}")
+
+
+def upload_in_background(result):
+    """Upload an EvaluationResult to the RAGAS app without waiting for it"""
+    future = _upload_pool.submit(result.upload)
+    future.add_done_callback(_log_upload_failure)
+    return future
+
+
+def combined_scores(result, references, responses):
+    """Per-sample scores of a RAGAS result together with the string metrics
+
+    BLEU, ROUGE, string similarity and string presence don't need an LLM, so they
+    are computed in one batch with fast_metrics_batch instead of going through
+    evaluate(). The result itself is left untouched.
+
+    Returns:
+        One dict of metric name -> score per sample, in dataset order
+    """
+    string_scores = {
+        metric_name: values.tolist()
+        for metric_name, values in fast_metrics_batch(references, responses).items()
+    }
+    return [
+        {**scores, **{metric_name: values[i] for metric_name, values in string_scores.items()}}
+        for i, scores in enumerate(result.scores)
+    ]
+
+
 def evaluate_single_test(
-    test_case, response, context, reference_contexts, llm_model_id
+    test_case, response, context, reference_contexts, llm_model_id, run_timestamp=None
 ):
-    """Evaluate a single test with RAGAS and return the results"""
+    """Evaluate a single test with RAGAS and return the results
+
+    Returns:
+        Tuple of (success, scores, error), where scores maps each metric name,
+        including the string metrics, to the test's score
+    """
     try:
         # Create single test dataset
-        test_data = pd.DataFrame(
-            {
-                "user_input": [test_case["query"]],
-                "reference": [test_case["ground_truth"]],
-                "response": [response],
-                "retrieved_contexts": [reference_contexts],
-            }
+        eval_dataset = EvaluationDataset.from_list(
+            [
+                {
+                    "user_input": test_case["query"],
+                    "reference": test_case["ground_truth"],
+                    "response": response,
+                    "retrieved_contexts": reference_contexts,
+                }
+            ]
         )
 
-        # Create evaluation dataset
-        eval_dataset = EvaluationDataset.from_pandas(test_data)
-
-        # Define metrics
-        metrics = [
-            LenientFactualCorrectness(),
-            SemanticSimilarity(embeddings=evaluator_embeddings),
-            # LLMContextRecall(llm=evaluator_llm),
-            Faithfulness(llm=evaluator_llm),
-            BleuScore(),
-            NonLLMStringSimilarity(),
-            RougeScore(),
-            StringPresence(),
-        ]
-        
         # Pre-register the extracted true value if available
-        if "extracted_true_value" in test_case and test_case["extracted_true_value"]:
-            try:
-                extracted_val = float(test_case["extracted_true_value"])
-                # Register this value with the LenientFactualCorrectness metric
-                for metric in metrics:
-                    if isinstance(metric, LenientFactualCorrectness):
-                        metric.register_extracted_true_value(test_case["ground_truth"], extracted_val)
-                        print(f"Pre-registered value {extracted_val} for test {test_case.get('test_no')}")
-                        break
-            except (ValueError, TypeError) as e:
-                print(f"Error converting extracted_true_value to float: {e}")
+        extracted_val = test_case.get("_extracted_true_float")
+        if extracted_val is not None:
+            # Register this value with the LenientFactualCorrectness metric
+            _LFC.register_extracted_true_value(test_case["ground_truth"], extracted_val)
+            print(f"Pre-registered value {extracted_val} for test {test_case.get('test_no')}")
+
+        # The ground truth is the same for every run of this test, keep its vector
+        try:
+            evaluator_embeddings.prime([test_case["ground_truth"]])
+        except Exception as e:
+            logger.warning(f"Embedding the ground truth ahead of evaluation failed: {e}")
 
         # Run evaluation on single test
-        result = evaluate(eval_dataset, metrics, llm=evaluator_llm)
-
-        RAGAS_APP_TOKEN = os.getenv("RAGAS_APP_TOKEN")
+        result = evaluate(
+            eval_dataset,
+            _METRICS,
+            llm=evaluator_llm,
+            embeddings=evaluator_embeddings,
+            run_config=EVALUATION_RUN_CONFIG,
+        )
+        scores = combined_scores(result, [test_case["ground_truth"]], [response])[0]
 
         if RAGAS_APP_TOKEN:
             print("Uploading results to RAGAS app")
-            result.upload()
+            upload_in_background(result)
 
         # Return success with results
-        return True, result, None
+        return True, scores, None
 
     except Exception as e:
         logger.error(f"RAGAS evaluation failed for test {test_case['test_no']}: {e}")
         print(f"RAGAS evaluation failed for test {test_case['test_no']}: {e}")
 
         # Save the RAGAS failed test
-        filepath = save_ragas_failed_test(test_case, llm_model_id, response, context, e)
+        filepath = save_ragas_failed_test(
+            test_case, llm_model_id, response, context, e, run_timestamp
+        )
 
         # Return failure with error
         return False, None, str(e)
 
 
-def run_synthetic_evaluation(
-    llm_model_id, progress_callback: Optional[Callable] = None
-):
-    """Run evaluation using the synthetic test cases"""
+# Columns of the per-test results DataFrame returned by run_synthetic_evaluation
+RESULT_COLUMNS = (
+    "test_no",
+    "query",
+    "ground_truth",
+    "response",
+    "context",
+    "reference_contexts",
+    "api_call_success",
+    "token_usage",
+    "tool_calls",
+    "ragas_evaluated",
+    "ragas_results",
+    "ragas_error",
+    "error",
+    "saved_path",
+)
+RESULT_DTYPES = {"test_no": "int32", "api_call_success": "bool", "ragas_evaluated": "bool"}
+
+# Result categories, in the order their rows appear in the DataFrame
+RAGAS_SUCCESS, RAGAS_FAILED, API_FAILED = 0, 1, 2
+
+# Judge calls RAGAS may have in flight during the batch evaluation
+EVALUATION_MAX_WORKERS = 16
+
+# Judge and embedding calls run concurrently on RAGAS's async executor. A call that
+# hangs past the timeout is recorded as NaN instead of stalling the evaluation
+EVALUATION_RUN_CONFIG = RunConfig(max_workers=EVALUATION_MAX_WORKERS, timeout=180)
+
+
+def _run_one_test_case(test_case, llm_model_id):
+    logger.info(f"Processing test case {test_case['test_no']}: {test_case['query'][:50]}...")
+    run_result = run_test_case(test_case["query"], llm_model_id, test_case.get("test_no"))
+    logger.info(f"API call success for test {test_case['test_no']}: {run_result[2]}")
+    return run_result
+
+
+def _run_test_cases(test_cases, llm_model_id, progress_callback=None):
+    """Run the test cases one after another, returning run_test_case results in input order"""
+    total = len(test_cases)
+    run_results = []
+    for completed, test_case in enumerate(test_cases, 1):
+        try:
+            run_results.append(_run_one_test_case(test_case, llm_model_id))
+        except Exception as error:
+            logger.error(f"Test {test_case['test_no']} raised an unexpected error: {error}")
+            error_message = f"Error processing query for test: {test_case['query']}: {error}"
+            run_results.append((error_message, str(error), False, None, None))
+        if progress_callback:
+            progress_callback(completed, total, f"Processed test {completed}/{total}")
+    return run_results
+
+
+def evaluate_test_batch(test_cases, responses, contexts, llm_model_id, run_timestamp=None):
+    """Evaluate a batch of answered tests with a single RAGAS evaluate() call
+
+    Used by run_synthetic_evaluation only; see there.
+
+    Returns:
+        Tuple containing:
+        - result: The EvaluationResult for the whole batch, or None if evaluate() failed
+        - outcomes: One (ragas_success, scores, ragas_error) tuple per test case
+    """
+    # Register all extracted true values before any sample is scored
+    for test_case in test_cases:
+        extracted_val = test_case.get("_extracted_true_float")
+        if extracted_val is not None:
+            _LFC.register_extracted_true_value(test_case["ground_truth"], extracted_val)
+
+    eval_dataset = EvaluationDataset.from_list(
+        [
+            {
+                "user_input": test_case["query"],
+                "reference": test_case["ground_truth"],
+                "response": response,
+                "retrieved_contexts": test_case["reference_contexts"],
+            }
+            for test_case, response in zip(test_cases, responses)
+        ]
+    )
+
+    # SemanticSimilarity embeds each reference and response on its own. Ground
+    # truths are primed so they are persisted; responses only go to the LRU cache
+    try:
+        evaluator_embeddings.prime([test_case["ground_truth"] for test_case in test_cases])
+        evaluator_embeddings.embed_documents([response for response in responses if response])
+    except Exception as e:
+        logger.warning(f"Embedding texts ahead of evaluation failed, falling back to per-text calls: {e}")
+
+    try:
+        result = evaluate(
+            eval_dataset,
+            _METRICS,
+            llm=evaluator_llm,
+            embeddings=evaluator_embeddings,
+            run_config=EVALUATION_RUN_CONFIG,
+        )
+    except Exception as e:
+        logger.error(f"RAGAS batch evaluation failed: {e}")
+        for test_case, response, context in zip(test_cases, responses, contexts):
+            save_ragas_failed_test(test_case, llm_model_id, response, context, e, run_timestamp)
+        return None, [(False, None, str(e))] * len(test_cases)
+
+    sample_scores = combined_scores(
+        result, [test_case["ground_truth"] for test_case in test_cases], responses
+    )
+
+    if RAGAS_APP_TOKEN:
+        print("Uploading results to RAGAS app")
+        upload_in_background(result)
+
+    # evaluate() records NaN (or None) instead of raising when a metric fails on a sample
+    outcomes = []
+    for test_case, response, context, scores in zip(test_cases, responses, contexts, sample_scores):
+        failed_metrics = [metric.name for metric in _METRICS if pd.isna(scores.get(metric.name))]
+        if failed_metrics:
+            error = f"RAGAS metrics failed: {', '.join(failed_metrics)}"
+            logger.error(f"RAGAS evaluation failed for test {test_case['test_no']}: {error}")
+            save_ragas_failed_test(test_case, llm_model_id, response, context, error, run_timestamp)
+            outcomes.append((False, None, error))
+        else:
+            outcomes.append((True, scores, None))
+
+    return result, outcomes
+
+
+def summarize_token_usage(token_usages):
+    """Sum the token_usage dicts of a run, skipping tests that reported none"""
+    token_df = pd.DataFrame([token_usage for token_usage in token_usages if token_usage])
+    return {name: int(total) for name, total in token_df.sum(numeric_only=True).items()}
+
+
+def run_synthetic_evaluation(llm_model_id, progress_callback: Optional[Callable] = None):
+    """Run evaluation using the synthetic test cases
+
+    Standalone batch path: answers all test cases, then scores them
+    with one evaluate() call. /api/evaluate doesn't use it; it goes through
+    execute_test_runs, which scores each run with evaluate_single_test.
+    """
     logger.info("Starting run_synthetic_evaluation...")
+    run_timestamp = make_run_timestamp()
 
     # Load synthetic test cases
     test_cases = load_synthetic_test_cases()
@@ -277,141 +519,100 @@ def run_synthetic_evaluation(
         logger.error("No test cases loaded - returning None")
         return None, None
 
-    # Create categories for tests
-    api_success_ragas_success = []  # API call success + RAGAS evaluation success
-    api_success_ragas_failed = []  # API call success + RAGAS evaluation failure
-    api_failed_tests = []  # API call failure
+    # Results are collected column-wise and turned into a DataFrame once at the end.
+    # Category orders the rows: API + RAGAS success, RAGAS failed, API failed
+    columns = {name: [] for name in RESULT_COLUMNS}
+    categories = []
 
-    # Store RAGAS results
-    all_ragas_results = []
+    def add_row(category, **values):
+        categories.append(category)
+        for name, column in columns.items():
+            column.append(values.get(name))
 
     logger.info(f"Number of test cases: {len(test_cases)}")
 
-    # Process each test case
-    for i, test_case in enumerate(test_cases):
-        if progress_callback:
-            progress_callback(
-                i, len(test_cases), f"Processing test {i+1}/{len(test_cases)}"
-            )
+    # Phase 1: get an answer for every test case
+    run_results = _run_test_cases(test_cases, llm_model_id, progress_callback)
+
+    # Phase 2: evaluate every answered test case in one RAGAS batch
+    answered = [i for i, run_result in enumerate(run_results) if run_result[2]]
+    ragas_outcomes = {}
+    if answered:
+        _, outcomes = evaluate_test_batch(
+            [test_cases[i] for i in answered],
+            [run_results[i][0] for i in answered],
+            [run_results[i][1] for i in answered],
+            llm_model_id,
+            run_timestamp,
+        )
+        ragas_outcomes = dict(zip(answered, outcomes))
 
+    # Collect the outcomes in test case order
+    for i, test_case in enumerate(test_cases):
         query = test_case["query"]
-        logger.info(f"Processing test case {test_case['test_no']}: {query[:50]}...")
-
-        # Run the API call
-        response, context, api_call_success, token_usage, tool_calls = run_test_case(
-            query, llm_model_id, test_case.get("test_no")
-        )
-        logger.info(f"API call success: {api_call_success}")
+        response, context, api_call_success, token_usage, tool_calls = run_results[i]
 
         if api_call_success:
-            # Run RAGAS evaluation on this single test
-            ragas_success, ragas_result, ragas_error = evaluate_single_test(
-                test_case,
-                response,
-                context,
-                test_case["reference_contexts"],
-                llm_model_id,
+            ragas_success, ragas_result, ragas_error = ragas_outcomes[i]
+
+            add_row(
+                RAGAS_SUCCESS if ragas_success else RAGAS_FAILED,
+                test_no=test_case["test_no"],
+                query=query,
+                ground_truth=test_case["ground_truth"],
+                response=response,
+                context=context,
+                reference_contexts=test_case["reference_contexts"],
+                api_call_success=True,
+                token_usage=token_usage,
+                tool_calls=tool_calls,
+                ragas_evaluated=ragas_success,
+                ragas_results=ragas_result,
+                ragas_error=ragas_error,
             )
-
-            # Common test result data
-            test_result = {
-                "test_no": test_case["test_no"],
-                "query": query,
-                "ground_truth": test_case["ground_truth"],
-                "response": response,
-                "context": context,
-                "reference_contexts": test_case["reference_contexts"],
-                "api_call_success": True,
-                "token_usage": token_usage,
-                "tool_calls": tool_calls,
-            }
-
-            if ragas_success:
-                # API call and RAGAS both successful
-                test_result["ragas_evaluated"] = True
-                test_result["ragas_results"] = ragas_result
-                api_success_ragas_success.append(test_result)
-                all_ragas_results.append(ragas_result)
-            else:
-                # API call success but RAGAS failed
-                test_result["ragas_evaluated"] = False
-                test_result["ragas_error"] = ragas_error
-                api_success_ragas_failed.append(test_result)
         else:
             # API call failed
             logger.warning(f"Test {test_case['test_no']} failed with error: {response}")
             print(f"Test {test_case['test_no']} failed with error: {response}")
 
             # Save failed test
-            filepath = save_failed_test(test_case, llm_model_id, response)
-
-            # Add to API failed tests list
-            api_failed_tests.append(
-                {
-                    "test_no": test_case["test_no"],
-                    "query": query,
-                    "ground_truth": test_case["ground_truth"],
-                    "error": str(response),
-                    "saved_path": filepath,
-                    "api_call_success": False,
-                    "ragas_evaluated": False,
-                    "tool_calls": tool_calls,
-                }
+            filepath = save_failed_test(test_case, llm_model_id, response, run_timestamp)
+
+            add_row(
+                API_FAILED,
+                test_no=test_case["test_no"],
+                query=query,
+                ground_truth=test_case["ground_truth"],
+                error=str(response),
+                saved_path=filepath,
+                api_call_success=False,
+                ragas_evaluated=False,
+                tool_calls=tool_calls,
             )
 
+    close_failure_logs()
+
     # Report on counts for each category
+    category_counts = np.bincount(np.asarray(categories, dtype=np.int8), minlength=3)
     logger.info(
-        f"Tests completed: {len(api_success_ragas_success)} successful + evaluated, "
-        + f"{len(api_success_ragas_failed)} successful but RAGAS failed, "
-        + f"{len(api_failed_tests)} API call failed"
+        f"Tests completed: {category_counts[RAGAS_SUCCESS]} successful + evaluated, "
+        + f"{category_counts[RAGAS_FAILED]} successful but RAGAS failed, "
+        + f"{category_counts[API_FAILED]} API call failed"
     )
 
-    # Combine all results into a single DataFrame for reporting
-    results = []
-    results.extend(api_success_ragas_success)
-    results.extend(api_success_ragas_failed)
-    results.extend(api_failed_tests)
-
-    # Create final DataFrame
-    all_tests_df = pd.DataFrame(results)
+    logger.info(f"Token usage totals: {summarize_token_usage(columns['token_usage'])}")
 
-    # Check if we have any successful RAGAS evaluations
-    if all_ragas_results:
-        # Combine all successful RAGAS results
-        combined_ragas_results = all_ragas_results[0]
+    # Build the final DataFrame straight from the columns, grouped by category
+    all_tests_df = pd.DataFrame(columns, copy=False).astype(RESULT_DTYPES, copy=False)
+    # One column per metric, joined in a single concat; rows without scores stay NaN
+    metrics_df = pd.DataFrame([scores or {} for scores in columns["ragas_results"]])
+    all_tests_df = pd.concat([all_tests_df, metrics_df], axis=1, copy=False)
+    order = np.argsort(np.asarray(categories, dtype=np.int8), kind="stable")
+    all_tests_df = all_tests_df.iloc[order].reset_index(drop=True)
 
-        # If there are multiple results, try to combine them
-        if len(all_ragas_results) > 1:
-            try:
-                for i in range(1, len(all_ragas_results)):
-                    # Convert EvaluationResult to dictionary if needed
-                    current_result = all_ragas_results[i]
-                    if hasattr(current_result, '__dict__'):
-                        current_result = current_result.__dict__
-                    elif hasattr(current_result, 'to_dict'):
-                        current_result = current_result.to_dict()
-                    
-                    # Get keys from combined_ragas_results
-                    if hasattr(combined_ragas_results, '__dict__'):
-                        combined_dict = combined_ragas_results.__dict__
-                    elif hasattr(combined_ragas_results, 'to_dict'):
-                        combined_dict = combined_ragas_results.to_dict()
-                    else:
-                        combined_dict = combined_ragas_results
-                        
-                    for metric_key in combined_dict:
-                        if metric_key in current_result:
-                            # Average the values for each metric
-                            combined_dict[metric_key] = (
-                                combined_dict[metric_key] + current_result[metric_key]
-                            ) / 2
-                            
-                    # Update combined_ragas_results
-                    combined_ragas_results = combined_dict
-            except Exception as e:
-                logger.error(f"Error combining RAGAS results: {e}")
-
-        return combined_ragas_results, all_tests_df
+    # Mean of each metric over the evaluated tests; unscored rows are NaN and skipped
+    if category_counts[RAGAS_SUCCESS]:
+        return metrics_df.mean(numeric_only=True).to_dict(), all_tests_df
     else:
         # No successful RAGAS evaluations
         return None, all_tests_df
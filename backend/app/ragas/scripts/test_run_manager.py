@@ -1,15 +1,14 @@
+import json
 import logging
+import os
+import random
 import sys
-from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Dict, List, Optional, Any, Tuple
 import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from enum import Enum
 from app.conf.postgres import get_cursor
-import ast
-import math
-import pandas as pd
-from app.helpers.save_query_to_db import save_query_with_eval_to_db
-from flask_socketio import emit
+from psycopg2.extras import execute_values
 from app.conf.websocket import socketio
 from flask import has_app_context
 
@@ -35,30 +34,59 @@ if not logger.handlers:
 
 def make_serializable(obj):
     """Recursively convert any non-serializable objects to serializable format"""
+    # Imported once per call here rather than at every level of the recursion;
+    # ragas is kept out of the module imports like pandas
     from ragas.dataset_schema import SingleTurnSample
-    
-    if isinstance(obj, SingleTurnSample):
+    return _make_serializable(obj, SingleTurnSample)
+
+def _make_serializable(obj, sample_type):
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        # JSON scalars, the bulk of the leaves; no need to test them with json.dumps
+        return obj
+    elif isinstance(obj, sample_type):
         # Convert SingleTurnSample to dict representation
         return str(obj)
     elif isinstance(obj, dict):
-        return {key: make_serializable(value) for key, value in obj.items()}
+        return {key: _make_serializable(value, sample_type) for key, value in obj.items()}
     elif isinstance(obj, list):
-        return [make_serializable(item) for item in obj]
+        return [_make_serializable(item, sample_type) for item in obj]
     elif isinstance(obj, tuple):
-        return tuple(make_serializable(item) for item in obj)
+        return tuple(_make_serializable(item, sample_type) for item in obj)
     elif hasattr(obj, '_repr_dict'):
         return obj._repr_dict
     elif hasattr(obj, 'to_dict') and callable(obj.to_dict):
-        return make_serializable(obj.to_dict())
+        return _make_serializable(obj.to_dict(), sample_type)
     else:
         # For any other types, try to convert to basic types
         try:
-            import json
             json.dumps(obj)  # Test if it's serializable
             return obj
         except (TypeError, ValueError):
             return str(obj)
 
+# Test runs executed in parallel by execute_test_runs
+MAX_PARALLEL_RUNS = 5
+# Upper bound for a requested max_parallel_runs; every run holds agent and judge
+# calls in flight and shares the database pool
+MAX_PARALLEL_RUNS_LIMIT = int(os.getenv("MAX_PARALLEL_RUNS_LIMIT", "10"))
+
+# Queued attempt history rows that trigger a write to the database
+HISTORY_FLUSH_SIZE = 50
+
+# Failed runs wait RETRY_BASE_DELAY * 2^(retry - 1) seconds, capped and jittered,
+# before they are handed out again
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 60.0
+
+# Minimum seconds between evaluation_progress emits of a test run
+PROGRESS_EMIT_INTERVAL = 0.25
+
+
+def retry_delay(retry_count: int, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY) -> float:
+    """Exponential backoff with jitter for the given retry (1 for the first retry)."""
+    delay = min(cap, base * 2 ** max(retry_count - 1, 0))
+    return delay * random.uniform(0.5, 1.5)
+
 class TestStatus(Enum):
     PENDING = "pending"
     RUNNING = "running"
@@ -91,6 +119,9 @@ class TestRunManager:
         # Track which evaluations were successful for reporting
         self.successful_evaluations: List[Dict[str, Any]] = []
         
+        # Attempt history rows waiting to be written, see flush_attempt_history
+        self._history_buffer: List[Tuple[str, int, int, str, Optional[str], Optional[int]]] = []
+        
         logger.info(f"Initialized TestRunManager for model {model_id} with {number_of_runs} runs per test and max {max_retries} retries")
         
     def initialize_test_runs(self, test_cases: List[Dict[str, Any]]) -> None:
@@ -114,19 +145,40 @@ class TestRunManager:
         logger.info(f"Initialized {len(test_cases)} test cases for {self.number_of_runs} runs each")
         self._log_test_status_summary()
     
-    def get_next_pending_test(self) -> Optional[Tuple[str, int, Dict[str, Any]]]:
+    def claim_next_pending_test(self) -> Optional[Tuple[str, int, Dict[str, Any]]]:
         """
-        Get the next pending test case that should be run.
+        Get the next pending test case and mark it as running in the same pass.
+        
+        A claimed run is no longer pending, so it can't be handed out twice.
         
         Returns:
             Tuple of (test_id, run_number, test_case) or None if no pending tests
         """
+        now = time.monotonic()
         for test_id, runs in self.test_status.items():
             for run_number, run_info in runs.items():
-                if run_info["status"] == TestStatus.PENDING:
+                if run_info["status"] == TestStatus.PENDING and run_info.get("retry_at", 0) <= now:
+                    run_info["status"] = TestStatus.RUNNING
                     return test_id, run_number, run_info["test_case"]
         return None
     
+    def seconds_until_next_retry(self) -> Optional[float]:
+        """
+        Get how long until the earliest pending run that is backing off may be claimed.
+        
+        Returns:
+            Seconds to wait (0 if one is ready), or None if no pending run is backing off
+        """
+        retry_times = [
+            run_info["retry_at"]
+            for runs in self.test_status.values()
+            for run_info in runs.values()
+            if run_info["status"] == TestStatus.PENDING and "retry_at" in run_info
+        ]
+        if not retry_times:
+            return None
+        return max(0.0, min(retry_times) - time.monotonic())
+    
     def all_tests_completed(self) -> bool:
         """
         Check if all tests are completed (either success or max retries reached).
@@ -140,16 +192,6 @@ class TestRunManager:
                     return False
         return True
     
-    def mark_test_running(self, test_id: str, run_number: int) -> None:
-        """
-        Mark a test as running.
-        
-        Args:
-            test_id: ID of the test
-            run_number: Run number for the test
-        """
-        self.test_status[test_id][run_number]["status"] = TestStatus.RUNNING
-        
     def mark_test_success(self, test_id: str, run_number: int, query_evaluation_id: Optional[int] = None) -> None:
         """
         Mark a test as successful.
@@ -188,10 +230,10 @@ class TestRunManager:
         retry_count = run_info["retry_count"]
         
         # Record the failed attempt
-        self._record_attempt_history(
-            test_id, run_number, retry_count - 1,  # Record the attempt that just failed
-            "failed", error_message
-        )
+        attempts = [
+            (test_id, run_number, retry_count - 1,  # Record the attempt that just failed
+             "failed", error_message, None)
+        ]
         
         # Check if max retries reached
         if retry_count >= self.max_retries:
@@ -200,17 +242,22 @@ class TestRunManager:
                 f"Test {test_id} (run {run_number}) reached max retries ({self.max_retries}): {error_message}"
             )
             
-            # Record final status as max retries reached
-            self._record_attempt_history(
-                test_id, run_number, retry_count,
-                "max_retries_reached", f"Max retries ({self.max_retries}) reached: {error_message}"
+            # Record final status as max retries reached, in the same insert
+            attempts.append(
+                (test_id, run_number, retry_count,
+                 "max_retries_reached", f"Max retries ({self.max_retries}) reached: {error_message}", None)
             )
         else:
-            # Reset to pending for next attempt
+            # Reset to pending for next attempt, once the backoff has passed
+            delay = retry_delay(retry_count)
             run_info["status"] = TestStatus.PENDING
+            run_info["retry_at"] = time.monotonic() + delay
             logger.info(
-                f"Test {test_id} (run {run_number}) failed, will retry ({retry_count}/{self.max_retries}): {error_message}"
+                f"Test {test_id} (run {run_number}) failed, will retry ({retry_count}/{self.max_retries}) "
+                f"in {delay:.1f}s: {error_message}"
             )
+
+        self._record_attempts(attempts)
     
     def add_successful_evaluation(self, evaluation_result: Dict[str, Any]) -> None:
         """Add a successful evaluation result to the tracking list"""
@@ -254,29 +301,52 @@ class TestRunManager:
                                status: str, error_message: Optional[str] = None,
                                query_evaluation_id: Optional[int] = None) -> None:
         """Record an attempt in the run_attempt_history table"""
+        self._record_attempts(
+            [(test_id, run_number, retry_count, status, error_message, query_evaluation_id)]
+        )
+
+    def _record_attempts(self, attempts: List[Tuple[str, int, int, str, Optional[str], Optional[int]]]) -> None:
+        """
+        Queue attempts for the run_attempt_history table.
+        
+        Rows are written in batches of HISTORY_FLUSH_SIZE; call flush_attempt_history
+        once the run is over to write the rest.
+        
+        Args:
+            attempts: (test_id, run_number, retry_count, status, error_message,
+                query_evaluation_id) tuples
+        """
+        self._history_buffer.extend(attempts)
+        if len(self._history_buffer) >= HISTORY_FLUSH_SIZE:
+            self.flush_attempt_history()
+    
+    def flush_attempt_history(self) -> None:
+        """Write all queued attempts to the run_attempt_history table with a single INSERT"""
+        if not self._history_buffer:
+            return
+        attempts, self._history_buffer = self._history_buffer, []
         try:
             with get_cursor() as cursor:
-                cursor.execute(
+                execute_values(
+                    cursor,
                     """
                     INSERT INTO public.run_attempt_history
                     (model_id, test_case_id, run_number, attempt_status, 
                      error_message, query_evaluation_id, retry_count)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    VALUES %s
                     """,
-                    (
-                        self.model_id,
-                        test_id,
-                        run_number,
-                        status,
-                        error_message,
-                        query_evaluation_id,
-                        retry_count
-                    )
-                )
-                logger.debug(
-                    f"Recorded attempt history: model={self.model_id}, "
-                    f"test={test_id}, run={run_number}, status={status}, retry={retry_count}"
+                    [
+                        (self.model_id, test_id, run_number, status,
+                         error_message, query_evaluation_id, retry_count)
+                        for test_id, run_number, retry_count, status, error_message, query_evaluation_id in attempts
+                    ],
+                    page_size=1000,
                 )
+                for test_id, run_number, retry_count, status, _, _ in attempts:
+                    logger.debug(
+                        f"Recorded attempt history: model={self.model_id}, "
+                        f"test={test_id}, run={run_number}, status={status}, retry={retry_count}"
+                    )
         except Exception as e:
             logger.error(f"Error recording attempt history: {e}")
     
@@ -333,7 +403,8 @@ def parse_test_selection(test_selection: str) -> List[int]:
     return sorted(list(set(indices)))  # Remove duplicates and sort
 
 def execute_test_runs(model_id: str, number_of_runs, 
-                     max_retries, progress_callback=None, test_data=None, test_selection=None):
+                     max_retries, progress_callback=None, test_data=None, test_selection=None,
+                     max_workers: int = MAX_PARALLEL_RUNS):
     """
     Main function to execute all test runs with retry logic.
     
@@ -344,6 +415,7 @@ def execute_test_runs(model_id: str, number_of_runs,
         progress_callback: Optional callback function for progress updates
         test_data: Optional pandas DataFrame containing test data (to avoid circular imports)
         test_selection: Optional string specifying which tests to run (e.g., "1", "1,3,5", "1-3")
+        max_workers: Maximum number of test runs executed in parallel
     
     Returns:
         Tuple of (combined_ragas_results, all_tests_df)
@@ -356,16 +428,22 @@ def execute_test_runs(model_id: str, number_of_runs,
     # Import here to avoid circular imports
     from app.ragas.scripts.synthetic_ragas_tests import (
         load_synthetic_test_cases, 
+        parse_extracted_true_values,
         run_test_case, 
-        evaluate_single_test
+        evaluate_single_test,
+        summarize_token_usage,
+        close_failure_logs,
+        make_run_timestamp,
     )
     from app.helpers.save_query_to_db import save_query_with_eval_to_db
+    # pandas is only needed once a run is executed, not by every importer of this module
+    import pandas as pd
     
     # Load test cases - either from test_data parameter or by loading them
     test_cases = []
     if test_data is not None:
         # Convert DataFrame to list of dictionaries
-        test_cases = test_data.to_dict(orient='records')
+        test_cases = parse_extracted_true_values(test_data.to_dict(orient='records'))
     else:
         test_cases = load_synthetic_test_cases()
     
@@ -383,13 +461,17 @@ def execute_test_runs(model_id: str, number_of_runs,
         test_cases = filtered_test_cases
         print(f"Filtered to {len(test_cases)} test cases based on selection: {test_selection}")
     
+    # All RAGAS failures of this run go to the same failure file
+    run_timestamp = make_run_timestamp()
+
     # Initialize test run manager
     run_manager = TestRunManager(model_id, number_of_runs, max_retries)
     run_manager.initialize_test_runs(test_cases)
     
     # Execute test runs until all are completed
     all_test_results = []
-    all_ragas_results = []
+    # Per-sample scores of every evaluated run, averaged once at the end
+    score_rows = []
     
     # After test cases are loaded, calculate total tests
     total_tests = len(test_cases)
@@ -412,52 +494,49 @@ def execute_test_runs(model_id: str, number_of_runs,
     except Exception as e:
         logger.error(f"Error emitting initial progress: {e}")
     
-    while not run_manager.all_tests_completed():
-        # Get next test to run
-        next_test = run_manager.get_next_pending_test()
-        if not next_test:
-            logger.info("No more tests to run")
-            break
-        
-        test_id, run_number, test_case = next_test
-        
-        # Update progress if callback provided
-        if progress_callback:
-            summary = run_manager.get_summary()
-            completed_tests = summary["successful_tests"] + summary["failed_tests"]
-            progress_callback(
-                completed_tests,
-                summary["total_tests"],
-                f"Running test {test_id} (run {run_number}/{number_of_runs})",
-                test_no=test_id,
-                total_tests=summary["total_tests"],
-                iteration=run_number,
-                total_iterations=number_of_runs
-            )
-        
-        # Mark test as running
-        run_manager.mark_test_running(test_id, run_number)
+    # With parallel runs, progress events arrive in bursts. They are coalesced to
+    # one emit per PROGRESS_EMIT_INTERVAL; a held back update is replaced by newer
+    # ones and sent once the interval has passed
+    last_progress_emit = 0.0
+    pending_progress = None
+    
+    def emit_progress(payload, force=False):
+        """Emit a progress update now, or hold it back. Returns True if emitted."""
+        nonlocal last_progress_emit, pending_progress
+        now = time.monotonic()
+        if not force and now - last_progress_emit < PROGRESS_EMIT_INTERVAL:
+            pending_progress = payload
+            return False
+        pending_progress = None
+        last_progress_emit = now
+        socketio.emit('evaluation_progress', payload, namespace='/query')
+        return True
+    
+    def flush_progress(force=False):
+        """Send the held back progress update if its interval has passed."""
+        if pending_progress is None:
+            return
+        try:
+            emit_progress(pending_progress, force=force)
+        except Exception as e:
+            logger.error(f"Error emitting progress: {e}")
+    
+    def seconds_until_progress_flush():
+        if pending_progress is None:
+            return None
+        return max(0.0, last_progress_emit + PROGRESS_EMIT_INTERVAL - time.monotonic())
+    
+    def _run_one(test_id, run_number, test_case):
+        """
+        Run, evaluate and save a single test run in a worker thread.
         
+        Returns:
+            Tuple of (test_result, error_msg, query_eval_id, ragas_scores, finished), where
+            error_msg is None on success and finished is True if the run got through evaluation
+        """
         try:
             logger.info(f"Running test {test_id} (run {run_number}/{number_of_runs})")
             
-            # Before the loop starts for a specific test
-            current_test_index += 1
-            
-            try:
-                socketio.emit('evaluation_progress', {
-                    'progress': current_run,
-                    'total': total_runs,
-                    'percent': int((current_run / total_runs) * 100),
-                    'test_no': test_id,
-                    'total_tests': total_tests,
-                    'iteration': run_number,
-                    'total_iterations': number_of_runs,
-                    'message': f'Running test {test_id}/{total_tests} iteration {run_number}/{number_of_runs}'
-                }, namespace='/query')
-            except Exception as e:
-                logger.error(f"Error emitting test progress: {e}")
-            
             # Run the test case
             query = test_case["query"]
             response, context, api_call_success, token_usage, tool_calls = run_test_case(
@@ -474,7 +553,6 @@ def execute_test_runs(model_id: str, number_of_runs,
             if not api_call_success:
                 # API call failed - just mark as failed and log in history
                 error_msg = "API call failed" if not response else str(response)
-                run_manager.mark_test_failed(test_id, run_number, error_msg)
                 
                 # Add minimal information to test results for reporting
                 test_result = {
@@ -489,22 +567,21 @@ def execute_test_runs(model_id: str, number_of_runs,
                     "token_usage": token_usage,
                     "tool_calls": tool_calls_str
                 }
-                all_test_results.append(test_result)
-                continue
+                return test_result, error_msg, None, None, False
             
             # API call succeeded, run RAGAS evaluation
-            ragas_success, ragas_result, ragas_error = evaluate_single_test(
+            ragas_success, ragas_scores, ragas_error = evaluate_single_test(
                 test_case,
                 response,
                 context,
                 test_case["reference_contexts"],
-                model_id
+                model_id,
+                run_timestamp,
             )
             
             if not ragas_success:
                 # RAGAS evaluation failed - mark as failed and log in history
                 error_msg = f"RAGAS evaluation failed: {ragas_error}"
-                run_manager.mark_test_failed(test_id, run_number, error_msg)
                 
                 # Add to results for reporting
                 test_result = {
@@ -522,25 +599,17 @@ def execute_test_runs(model_id: str, number_of_runs,
                     "token_usage": token_usage,
                     "tool_calls": tool_calls_str
                 }
-                all_test_results.append(test_result)
-                continue
+                return test_result, error_msg, None, None, False
             
             # Everything succeeded - proceed to save to database
             try:
+                error_msg = None
+                query_eval_id = None
                 # Process RAGAS metrics if available
-                if ragas_success and ragas_result:
-                    # Extract metrics from the RAGAS result
+                if ragas_success and ragas_scores:
+                    # Extract metrics from the test's scores
                     try:
-                        # Based on the log output, ragas_result behaves like a dict 
-                        # but is actually an EvaluationResult object
-                        metrics = {}
-                        
-                        # Check if it has a _repr_dict with all metrics
-                        if hasattr(ragas_result, '_repr_dict') and ragas_result._repr_dict:
-                            metrics = ragas_result._repr_dict
-                        # Fall back to using it as a dict directly
-                        elif hasattr(ragas_result, '__getitem__'):
-                            metrics = ragas_result
+                        metrics = ragas_scores
                         
                         # Add each metric to evaluation_data, properly handling 0 values
                         evaluation_data = {
@@ -553,7 +622,10 @@ def execute_test_runs(model_id: str, number_of_runs,
                         evaluation_data["faithfulness"] = metrics.get("faithfulness")
                         evaluation_data["bleu_score"] = metrics.get("bleu_score")
                         evaluation_data["non_llm_string_similarity"] = metrics.get("non_llm_string_similarity")
-                        evaluation_data["rogue_score"] = metrics.get("rouge_score(mode=fmeasure)") or metrics.get("rouge_score")
+                        rouge = metrics.get("rouge_score(mode=fmeasure)")
+                        if rouge is None:
+                            rouge = metrics.get("rouge_score")
+                        evaluation_data["rogue_score"] = rouge
                         evaluation_data["string_present"] = metrics.get("string_present")
                         
                         # Save the results to database immediately for this test
@@ -569,9 +641,6 @@ def execute_test_runs(model_id: str, number_of_runs,
                             tool_calls=tool_calls_str
                         )
                         
-                        # Mark the test as successful
-                        run_manager.mark_test_success(test_id, run_number, query_eval_id)
-                        
                     except Exception as e:
                         logger.error(f"Failed to process RAGAS metrics: {e}")
                         print(f"Failed to process RAGAS metrics: {e}")
@@ -584,7 +653,7 @@ def execute_test_runs(model_id: str, number_of_runs,
                         # Ensure query_eval_id is set to None if the RAGAS processing fails
                         query_eval_id = None
                         # Mark the test as failed
-                        run_manager.mark_test_failed(test_id, run_number, f"RAGAS processing error: {e}")
+                        error_msg = f"RAGAS processing error: {e}"
                 
                 # Create test result with all the metrics included
                 test_result = {
@@ -614,59 +683,140 @@ def execute_test_runs(model_id: str, number_of_runs,
                 }
                 
                 # Instead of storing the raw RAGAS result object, store only the metrics in a serializable format
-                if ragas_success and ragas_result:
-                    if hasattr(ragas_result, '_repr_dict'):
-                        test_result["ragas_metrics"] = ragas_result._repr_dict
-                    else:
-                        test_result["ragas_metrics"] = str(ragas_result)
+                if ragas_success and ragas_scores:
+                    test_result["ragas_metrics"] = dict(ragas_scores)
                 else:
                     test_result["ragas_metrics"] = None
                 
-                all_test_results.append(test_result)
-                all_ragas_results.append(ragas_result)
-                run_manager.add_successful_evaluation(test_result)
+                return test_result, error_msg, query_eval_id, ragas_scores, True
                 
             except Exception as e:
                 logger.error(f"Failed to process RAGAS metrics: {e}")
                 print(f"Failed to process RAGAS metrics: {e}")
-                evaluation_data = {
-                    "retrieved_contexts": str(test_case["reference_contexts"]),
-                    "ground_truth": test_case["ground_truth"],
-                }
-                # Ensure query_eval_id is set to None if the RAGAS processing fails
-                query_eval_id = None
                 # Mark the test as failed
-                run_manager.mark_test_failed(test_id, run_number, f"RAGAS processing error: {e}")
-            
-            # After the test completes successfully
-            current_run += 1
-            
-            try:
-                if has_app_context():
-                    socketio.emit('evaluation_progress', {
-                        'progress': current_run,
-                        'total': total_runs,
-                        'percent': int((current_run / total_runs) * 100),
-                        'test_no': test_id,
-                        'total_tests': total_tests,
-                        'iteration': run_number,
-                        'total_iterations': number_of_runs,
-                        'message': f'Completed test {test_id}/{total_tests}, iteration {run_number}/{number_of_runs}'
-                    }, namespace='/query')
-                    # Add debug log to confirm emission
-                    logger.info(f"Emitted progress update: Test {test_id}/{total_tests}, Iteration {run_number}/{number_of_runs}, Progress {current_run}/{total_runs}")
-                else:
-                    logger.info(f"Progress update (no socket context): Test {test_id}/{total_tests}, Iteration {run_number}/{number_of_runs}, Progress {current_run}/{total_runs}")
-            except Exception as e:
-                logger.error(f"Error emitting completion progress: {e}")
+                return None, f"RAGAS processing error: {e}", None, None, True
             
         except Exception as e:
             logger.error(f"Error running test {test_id} (run {run_number}): {e}")
-            run_manager.mark_test_failed(test_id, run_number, str(e))
             
-            # Small delay before retrying to avoid overwhelming the API
-            time.sleep(1)
+            # The retry is delayed by the run manager (see retry_delay), not here
+            return None, str(e), None, None, False
     
+    # Test runs are independent and dominated by LLM latency, so up to max_workers
+    # run at once. Workers only run, evaluate and save a test; the run manager,
+    # result lists and progress updates are handled here on the calling thread
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="test-run") as pool:
+            in_flight = {}
+            while True:
+                # Fill free worker slots with pending tests (including retries)
+                while len(in_flight) < max_workers:
+                    next_test = run_manager.claim_next_pending_test()
+                    if not next_test:
+                        break
+                
+                    test_id, run_number, test_case = next_test
+                
+                    # Update progress if callback provided
+                    if progress_callback:
+                        summary = run_manager.get_summary()
+                        completed_tests = summary["successful_tests"] + summary["failed_tests"]
+                        progress_callback(
+                            completed_tests,
+                            summary["total_tests"],
+                            f"Running test {test_id} (run {run_number}/{number_of_runs})",
+                            test_no=test_id,
+                            total_tests=summary["total_tests"],
+                            iteration=run_number,
+                            total_iterations=number_of_runs
+                        )
+                
+                    # Before the loop starts for a specific test
+                    current_test_index += 1
+                
+                    try:
+                        emit_progress({
+                            'progress': current_run,
+                            'total': total_runs,
+                            'percent': int((current_run / total_runs) * 100),
+                            'test_no': test_id,
+                            'total_tests': total_tests,
+                            'iteration': run_number,
+                            'total_iterations': number_of_runs,
+                            'message': f'Running test {test_id}/{total_tests} iteration {run_number}/{number_of_runs}'
+                        })
+                    except Exception as e:
+                        logger.error(f"Error emitting test progress: {e}")
+                
+                    future = pool.submit(_run_one, test_id, run_number, test_case)
+                    in_flight[future] = (test_id, run_number)
+            
+                # Failed runs backing off aren't claimable yet; wake up when one is
+                retry_wait = run_manager.seconds_until_next_retry()
+                if not in_flight:
+                    if retry_wait is None:
+                        logger.info("No more tests to run")
+                        break
+                    flush_progress(force=True)
+                    time.sleep(retry_wait)
+                    continue
+            
+                # With every worker busy a ready retry has to wait for a slot anyway
+                timeout = retry_wait if len(in_flight) < max_workers else None
+                progress_wait = seconds_until_progress_flush()
+                if progress_wait is not None:
+                    timeout = progress_wait if timeout is None else min(timeout, progress_wait)
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                flush_progress()
+                for future in done:
+                    test_id, run_number = in_flight.pop(future)
+                    test_result, error_msg, query_eval_id, ragas_scores, finished = future.result()
+                
+                    if test_result is not None:
+                        all_test_results.append(test_result)
+                
+                    if error_msg is None:
+                        # Mark the test as successful
+                        run_manager.mark_test_success(test_id, run_number, query_eval_id)
+                        run_manager.add_successful_evaluation(test_result)
+                        if ragas_scores:
+                            score_rows.append(ragas_scores)
+                    else:
+                        run_manager.mark_test_failed(test_id, run_number, error_msg)
+                
+                    if not finished:
+                        continue
+                
+                    # After the test completes successfully
+                    current_run += 1
+                
+                    try:
+                        if has_app_context():
+                            emitted = emit_progress({
+                                'progress': current_run,
+                                'total': total_runs,
+                                'percent': int((current_run / total_runs) * 100),
+                                'test_no': test_id,
+                                'total_tests': total_tests,
+                                'iteration': run_number,
+                                'total_iterations': number_of_runs,
+                                'message': f'Completed test {test_id}/{total_tests}, iteration {run_number}/{number_of_runs}'
+                            }, force=current_run >= total_runs)
+                            # Add debug log to confirm emission
+                            if emitted:
+                                logger.info(f"Emitted progress update: Test {test_id}/{total_tests}, Iteration {run_number}/{number_of_runs}, Progress {current_run}/{total_runs}")
+                        else:
+                            logger.info(f"Progress update (no socket context): Test {test_id}/{total_tests}, Iteration {run_number}/{number_of_runs}, Progress {current_run}/{total_runs}")
+                    except Exception as e:
+                        logger.error(f"Error emitting completion progress: {e}")
+    finally:
+        # Write the attempt history still queued, also if the run was aborted
+        run_manager.flush_attempt_history()
+        # The last progress update is never dropped
+        flush_progress(force=True)
+    
+    close_failure_logs()
+
     # Final progress update
     if progress_callback:
         summary = run_manager.get_summary()
@@ -679,26 +829,19 @@ def execute_test_runs(model_id: str, number_of_runs,
     # Convert results to DataFrame
     results_df = pd.DataFrame(all_test_results) if all_test_results else None
     
-    # Combine RAGAS results if available
+    # Combine RAGAS results into the mean of each metric over all evaluated runs
     combined_ragas_results = None
-    if all_ragas_results:
-        # Logic to combine RAGAS results (similar to existing code)
-        combined_ragas_results = all_ragas_results[0]
-        # Additional logic for combining multiple results would go here
+    if score_rows:
+        all_scores = pd.DataFrame(score_rows)
+        combined_ragas_results = all_scores.select_dtypes("number").mean().to_dict()
     
     # Generate summary
     summary = run_manager.get_summary()
     logger.info(f"Test run summary: {summary}")
+    logger.info(f"Token usage totals: {summarize_token_usage(result.get('token_usage') for result in all_test_results)}")
     
     # Convert any non-serializable objects in combined_ragas_results
-    serializable_combined_results = None
-    if combined_ragas_results:
-        if hasattr(combined_ragas_results, '_repr_dict'):
-            serializable_combined_results = combined_ragas_results._repr_dict
-        elif hasattr(combined_ragas_results, 'to_dict') and callable(combined_ragas_results.to_dict):
-            serializable_combined_results = combined_ragas_results.to_dict()
-        else:
-            serializable_combined_results = str(combined_ragas_results)
+    serializable_combined_results = combined_ragas_results
 
     # Convert results_df to JSON-serializable format
     if results_df is not None:
@@ -716,26 +859,29 @@ def execute_test_runs(model_id: str, number_of_runs,
 
     # Convert results into a nicely formatted Markdown string and metrics object
     def format_test_results_for_response(test_results, combined_metrics):
-        # Create a Markdown-formatted string for the full response
-        markdown_output = "# Evaluation Results\n\n"
+        # Create a Markdown-formatted string for the full response. Sections are
+        # collected in a list and joined once, as repeated += copies the whole string
+        markdown_parts = ["# Evaluation Results\n\n"]
         
         for test in test_results:
             test_no = test.get("test_no", "Unknown")
-            markdown_output += f"## Test Case {test_no}\n\n"
+            markdown_parts.append(f"## Test Case {test_no}\n\n")
             
             # Question
-            markdown_output += f"### Question\n{test.get('query', '')}\n\n"
+            markdown_parts.append(f"### Question\n{test.get('query', '')}\n\n")
             
             # Reference Answer
-            markdown_output += f"### Reference Answer\n{test.get('ground_truth', '')}\n\n"
+            markdown_parts.append(f"### Reference Answer\n{test.get('ground_truth', '')}\n\n")
             
             # Model Response
-            markdown_output += f"### Model Response\n{test.get('response', '')}\n\n"
+            markdown_parts.append(f"### Model Response\n{test.get('response', '')}\n\n")
             
             # Context
-            markdown_output += f"### Context\n{test.get('context', [])}\n\n"
+            markdown_parts.append(f"### Context\n{test.get('context', [])}\n\n")
             
-            markdown_output += "---\n\n"
+            markdown_parts.append("---\n\n")
+        
+        markdown_output = "".join(markdown_parts)
         
         # Format the metrics for the results object
         results = {}
@@ -757,9 +903,6 @@ def execute_test_runs(model_id: str, number_of_runs,
             "results": results
         }
 
-    # Convert results_df to a list of dictionaries if it's not None
-    results_dict = results_df.to_dict(orient='records') if results_df is not None else []
-
     # Format the response in the required structure
     formatted_response = format_test_results_for_response(results_dict, serializable_combined_results)
 
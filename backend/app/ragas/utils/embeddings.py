@@ -0,0 +1,191 @@
+import atexit
+import hashlib
+import logging
+import threading
+import typing as t
+from collections import OrderedDict
+from pathlib import Path
+
+import orjson
+from langchain_core.embeddings import Embeddings
+from ragas.embeddings import LangchainEmbeddingsWrapper
+
+logger = logging.getLogger(__name__)
+
+
+LOCAL_EMBEDDINGS_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def _detect_device() -> str:
+    """Best available torch device: CUDA, then Apple MPS, then CPU"""
+    import torch
+
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+class LocalSentenceEmbeddings(Embeddings):
+    """LangChain embeddings backed by a local sentence-transformers model
+
+    sentence-transformers is an optional dependency and only imported when this
+    class is used.
+    """
+
+    def __init__(self, model_name: str = LOCAL_EMBEDDINGS_MODEL, batch_size: int = 64):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "Local embeddings need sentence-transformers: pip install sentence-transformers"
+            ) from e
+
+        self.model = model_name
+        self.batch_size = batch_size
+        self._encoder = SentenceTransformer(model_name, device=_detect_device())
+
+    def embed_documents(self, texts: t.List[str]) -> t.List[t.List[float]]:
+        vectors = self._encoder.encode(
+            texts, batch_size=self.batch_size, convert_to_numpy=True, normalize_embeddings=True
+        )
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> t.List[float]:
+        return self.embed_documents([text])[0]
+
+
+# Vectors kept for texts that weren't passed to prime(), e.g. agent responses
+EMBEDDINGS_CACHE_SIZE = 4096
+
+
+class CachingEmbeddings(LangchainEmbeddingsWrapper):
+    """LangchainEmbeddingsWrapper that embeds each distinct text only once
+
+    Ground truths and reference contexts are the same for every run of a test set.
+    Vectors of the texts passed to prime() are kept for the process and, when
+    cache_path is given, persisted to a JSON file that is reloaded by the next run.
+    Any other text, such as agent responses, goes into an LRU cache of maxsize
+    entries that is never persisted.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        cache_path: t.Optional[t.Union[str, Path]] = None,
+        maxsize: int = EMBEDDINGS_CACHE_SIZE,
+        **kwargs,
+    ):
+        super().__init__(embeddings, **kwargs)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.maxsize = maxsize
+        # Vectors depend on the model, so it is part of every key
+        self._model = str(getattr(embeddings, "model", ""))
+        # Vectors of primed texts; the only ones written back to cache_path
+        self._references: t.Dict[str, t.List[float]] = {}
+        # Vectors read from cache_path; they become references again once primed
+        self._persisted: t.Dict[str, t.List[float]] = {}
+        self._recent: "OrderedDict[str, t.List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        if self.cache_path:
+            if self.cache_path.exists():
+                try:
+                    self._persisted = orjson.loads(self.cache_path.read_bytes())
+                except orjson.JSONDecodeError:
+                    logger.warning(f"Ignoring unreadable embeddings cache {self.cache_path}")
+            atexit.register(self.save)
+
+    def _key(self, text: str, kind: str) -> str:
+        data = f"{self._model}\0{kind}\0{text}".encode()
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def _get(self, key: str) -> t.Optional[t.List[float]]:
+        vector = self._references.get(key)
+        if vector is None:
+            vector = self._persisted.get(key)
+        if vector is None:
+            vector = self._recent.get(key)
+            if vector is not None:
+                self._recent.move_to_end(key)
+        return vector
+
+    def _lookup(self, texts: t.List[str], kind: str) -> t.Tuple[t.Dict[str, t.Optional[t.List[float]]], t.Dict[str, str]]:
+        """Cached vector of every distinct text (None if missing), plus its key"""
+        keys = {text: self._key(text, kind) for text in texts}
+        with self._lock:
+            found = {text: self._get(key) for text, key in keys.items()}
+        return found, keys
+
+    def _store(self, keys: t.Dict[str, str], vectors: t.Dict[str, t.List[float]], reference: bool = False) -> None:
+        with self._lock:
+            for text, vector in vectors.items():
+                key = keys[text]
+                if reference:
+                    if key not in self._references:
+                        self._references[key] = vector
+                        self._dirty = True
+                    self._recent.pop(key, None)
+                else:
+                    self._recent[key] = vector
+                    self._recent.move_to_end(key)
+            while len(self._recent) > self.maxsize:
+                self._recent.popitem(last=False)
+
+    def _embed_documents(self, texts: t.List[str], reference: bool = False) -> t.List[t.List[float]]:
+        found, keys = self._lookup(texts, "document")
+        missing = [text for text, vector in found.items() if vector is None]
+        if missing:
+            new_vectors = dict(zip(missing, super().embed_documents(missing)))
+            found.update(new_vectors)
+            if not reference:
+                self._store(keys, new_vectors)
+        if reference:
+            self._store(keys, found, reference=True)
+        return [found[text] for text in texts]
+
+    def embed_documents(self, texts: t.List[str]) -> t.List[t.List[float]]:
+        return self._embed_documents(texts)
+
+    async def aembed_documents(self, texts: t.List[str]) -> t.List[t.List[float]]:
+        found, keys = self._lookup(texts, "document")
+        missing = [text for text, vector in found.items() if vector is None]
+        if missing:
+            new_vectors = dict(zip(missing, await super().aembed_documents(missing)))
+            found.update(new_vectors)
+            self._store(keys, new_vectors)
+        return [found[text] for text in texts]
+
+    def embed_query(self, text: str) -> t.List[float]:
+        found, keys = self._lookup([text], "query")
+        if found[text] is None:
+            found[text] = super().embed_query(text)
+            self._store(keys, found)
+        return found[text]
+
+    async def aembed_query(self, text: str) -> t.List[float]:
+        found, keys = self._lookup([text], "query")
+        if found[text] is None:
+            found[text] = await super().aembed_query(text)
+            self._store(keys, found)
+        return found[text]
+
+    def prime(self, texts: t.Iterable[str]) -> None:
+        """Embed the reference texts of a test set in one request and keep them
+
+        RAGAS metrics embed one text at a time, so filling the cache up front turns
+        N embedding round trips into one. Only pass texts that recur across runs,
+        like ground truths and reference contexts: these are the vectors persisted.
+        """
+        self._embed_documents([text for text in texts if text], reference=True)
+
+    def save(self) -> None:
+        """Write the vectors of primed texts to cache_path if any were added"""
+        if not self.cache_path or not self._dirty:
+            return
+        with self._lock:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_path.write_bytes(orjson.dumps(self._references))
+            self._dirty = False
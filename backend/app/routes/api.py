@@ -1,4 +1,6 @@
 import json
+import functools
+import time
 from flask import Blueprint, request, jsonify, current_app, Response
 from app.helpers.load_json_from_file import load_json_from_file
 from dotenv import load_dotenv
@@ -9,7 +11,10 @@ from agno.tools.python import PythonTools
 from app.services.agent import initialize_agent
 import pandas as pd
 from app.services.query_with_eval import query_with_eval
+from app.ragas.scripts.test_run_manager import MAX_PARALLEL_RUNS_LIMIT
+from ragas.dataset_schema import SingleTurnSample
 from app.conf.postgres import get_cursor
+from app.helpers.materialized_views import refresh_views_if_stale, views_generation
 import logging
 from pathlib import Path
 from collections import OrderedDict
@@ -69,6 +74,7 @@ def evaluate_endpoint():
     number_of_runs = data.get("number_of_runs", 1)
     max_retries = data.get("max_retries", 3)
     test_selection = data.get("test_selection")
+    max_parallel_runs = data.get("max_parallel_runs")
 
     print(f"🔍 DEBUG API: Received request with data: {data}")
     print(f"🔍 DEBUG API: test_selection parameter: {test_selection}")
@@ -76,11 +82,26 @@ def evaluate_endpoint():
     if not model_id:
         return jsonify({"error": "Model ID is required"}), 400
 
+    if max_parallel_runs is not None:
+        # bool is an int subclass and int() would silently truncate floats
+        if isinstance(max_parallel_runs, (bool, float)):
+            return jsonify({"error": "max_parallel_runs must be an integer"}), 400
+        try:
+            max_parallel_runs = int(max_parallel_runs)
+        except (TypeError, ValueError):
+            return jsonify({"error": "max_parallel_runs must be an integer"}), 400
+        if not 1 <= max_parallel_runs <= MAX_PARALLEL_RUNS_LIMIT:
+            logger.warning(
+                f"Clamping max_parallel_runs {max_parallel_runs} to 1..{MAX_PARALLEL_RUNS_LIMIT}"
+            )
+            max_parallel_runs = max(1, min(max_parallel_runs, MAX_PARALLEL_RUNS_LIMIT))
+
     results, status_code = query_with_eval(
         model_id, 
         number_of_runs=number_of_runs,
         max_retries=max_retries,
-        test_selection=test_selection
+        test_selection=test_selection,
+        max_parallel_runs=max_parallel_runs
     )
     
     # Add extensive debugging to understand the structure of results
@@ -137,58 +158,80 @@ def evaluate_endpoint():
     return jsonify(results), status_code
 
 
+# Seconds the model performance rows are reused; views refreshed by another
+# backend process are picked up after at most this long
+MODEL_PERFORMANCE_CACHE_SECONDS = 10
+
+# Largest page /full-query-data returns when a limit is requested
+FULL_QUERY_DATA_MAX_PAGE_SIZE = 1000
+
+
+# The aggregated view is a few rows per model and only changes when the views are
+# refreshed, so it is cached per refresh generation and for a short time window
+@functools.lru_cache(maxsize=8)
+def _model_performance_rows(model_type, generation, time_window):
+    with get_cursor() as cursor:
+        query = """
+        SELECT * FROM model_performance_metrics
+        """
+
+        params = []
+        if model_type:
+            query += " WHERE model_type = %s"
+            params.append(model_type)
+
+        query += " ORDER BY model_name"
+
+        cursor.execute(query, params)
+        columns = [desc[0] for desc in cursor.description]
+        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    # Convert metrics to proper format for visualization
+    for result in results:
+        for key, value in result.items():
+            if key.startswith("avg_") and value is not None:
+                result[key] = float(value)
+
+    return results
+
+
 @api_bp.route("/model-performance", methods=["GET"])
 def model_performance():
     """Get aggregated model performance metrics."""
     try:
         model_type = request.args.get("type")
 
-        with get_cursor() as cursor:
-            query = """
-            SELECT * FROM model_performance_metrics
-            """
-
-            params = []
-            if model_type:
-                query += " WHERE model_type = %s"
-                params.append(model_type)
-
-            query += " ORDER BY model_name"
-
-            cursor.execute(query, params)
-            columns = [desc[0] for desc in cursor.description]
-            results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        refresh_views_if_stale()
+        results = _model_performance_rows(
+            model_type,
+            views_generation(),
+            int(time.monotonic() // MODEL_PERFORMANCE_CACHE_SECONDS),
+        )
 
-            # Convert metrics to proper format for visualization
-            for result in results:
-                for key, value in result.items():
-                    if key.startswith("avg_") and value is not None:
-                        result[key] = float(value)
-
-            return jsonify(
-                {
-                    "data": results,
-                    "metrics": [
-                        {
-                            "id": "avg_factual_correctness",
-                            "name": "Factual Correctness",
-                        },
-                        {
-                            "id": "avg_semantic_similarity",
-                            "name": "Semantic Similarity",
-                        },
-                        {"id": "avg_context_recall", "name": "Context Recall"},
-                        {"id": "avg_faithfulness", "name": "Faithfulness"},
-                        {"id": "avg_bleu_score", "name": "BLEU Score"},
-                        {
-                            "id": "avg_non_llm_string_similarity",
-                            "name": "String Similarity",
-                        },
-                        {"id": "avg_rogue_score", "name": "ROUGE Score"},
-                        {"id": "avg_string_present", "name": "String Present"},
-                    ],
-                }
-            )
+        return jsonify(
+            {
+                "data": results,
+                "metrics": [
+                    {
+                        "id": "avg_factual_correctness",
+                        "name": "Factual Correctness",
+                    },
+                    {
+                        "id": "avg_semantic_similarity",
+                        "name": "Semantic Similarity",
+                    },
+                    {"id": "avg_context_recall", "name": "Context Recall"},
+                    {"id": "avg_faithfulness", "name": "Faithfulness"},
+                    {"id": "avg_bleu_score", "name": "BLEU Score"},
+                    {
+                        "id": "avg_non_llm_string_similarity",
+                        "name": "String Similarity",
+                    },
+                    {"id": "avg_rogue_score", "name": "ROUGE Score"},
+                    {"id": "avg_string_present", "name": "String Present"},
+                ],
+            }
+        )
 
     except Exception as e:
         logger.error(f"Error fetching model performance: {e}")
@@ -197,47 +240,86 @@ def model_performance():
 
 @api_bp.route("/full-query-data", methods=["GET"])
 def query_data():
-    """Get full results for all evaluated queries."""
-    try:
+    """Get full results for all evaluated queries.
+
+    Paging is opt-in: with a limit (at most FULL_QUERY_DATA_MAX_PAGE_SIZE) and
+    optional offset, one page of rows is returned, newest first, together with
+    limit, offset and has_more. Without them every row is returned as before.
+    """
+    limit = request.args.get("limit")
+    offset = request.args.get("offset")
+    if limit is not None or offset is not None:
+        try:
+            limit = int(limit) if limit is not None else FULL_QUERY_DATA_MAX_PAGE_SIZE
+            offset = int(offset) if offset is not None else 0
+        except ValueError:
+            return jsonify({"error": "limit and offset must be integers"}), 400
+        if limit < 1 or offset < 0:
+            return jsonify({"error": "limit must be positive and offset not negative"}), 400
+        limit = min(limit, FULL_QUERY_DATA_MAX_PAGE_SIZE)
 
+    try:
+        refresh_views_if_stale()
         with get_cursor() as cursor:
-            query = """
-            SELECT * FROM full_query_data
-            """
-            cursor.execute(query)
+            if limit is None:
+                cursor.execute("SELECT * FROM full_query_data")
+            else:
+                # One extra row tells whether another page follows
+                cursor.execute(
+                    """
+                    SELECT * FROM full_query_data
+                    ORDER BY query_timestamp DESC, evaluation_metric_id DESC
+                    LIMIT %s OFFSET %s
+                    """,
+                    (limit + 1, offset),
+                )
             columns = [desc[0] for desc in cursor.description]
             results = [dict(zip(columns, row)) for row in cursor.fetchall()]
 
+        if limit is None:
             return jsonify({"data": results})
+        return jsonify({
+            "data": results[:limit],
+            "limit": limit,
+            "offset": offset,
+            "has_more": len(results) > limit,
+        })
 
     except Exception as e:
         logger.error(f"Error fetching model performance: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+TEST_CASES_PATH = Path("app/ragas/test_cases/synthetic_test_cases.json")
+
+
+@functools.lru_cache(maxsize=1)
+def _test_cases_json(mtime_ns):
+    """Serialized /test-cases response; keyed on the file's mtime so edits are picked up"""
+    with open(TEST_CASES_PATH, "r") as f:
+        test_cases = json.load(f)
+
+    # Create an ordered list of test cases
+    ordered_test_cases = []
+    for test_case in test_cases:
+        ordered_test_case = OrderedDict()
+        ordered_test_case["query"] = test_case["query"]
+        ordered_test_case["reference_contexts"] = test_case["reference_contexts"]
+        ordered_test_case["ground_truth"] = test_case["ground_truth"]
+        ordered_test_case["synthesizer_name"] = test_case["synthesizer_name"]
+        ordered_test_cases.append(ordered_test_case)
+
+    response_data = {"test_cases": ordered_test_cases}
+    return json.dumps(response_data, indent=2)
+
+
 @api_bp.route("/test-cases", methods=["GET"])
 def get_test_cases():
     try:
-        # Load test cases from JSON file
-        test_cases_path = Path("app/ragas/test_cases/synthetic_test_cases.json")
-        with open(test_cases_path, "r") as f:
-            test_cases = json.load(f)
-
-        # Create an ordered list of test cases
-        ordered_test_cases = []
-        for test_case in test_cases:
-            ordered_test_case = OrderedDict()
-            ordered_test_case["query"] = test_case["query"]
-            ordered_test_case["reference_contexts"] = test_case["reference_contexts"]
-            ordered_test_case["ground_truth"] = test_case["ground_truth"]
-            ordered_test_case["synthesizer_name"] = test_case["synthesizer_name"]
-            ordered_test_cases.append(ordered_test_case)
-
-        response_data = {"test_cases": ordered_test_cases}
-
-        return Response(
-            json.dumps(response_data, indent=2), mimetype="application/json"
-        )
+        # Load test cases from JSON file, parsing it again only after it changed
+        test_cases_json = _test_cases_json(TEST_CASES_PATH.stat().st_mtime_ns)
+
+        return Response(test_cases_json, mimetype="application/json")
     except Exception as e:
         logger.error(f"Error fetching test cases: {e}")
         return jsonify({"error": str(e)}), 500
@@ -302,9 +384,10 @@ def test_tools():
 
 def make_json_serializable(obj):
     """Recursively convert any non-serializable objects to serializable format"""
-    from ragas.dataset_schema import SingleTurnSample
-    
-    if isinstance(obj, SingleTurnSample):
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        # JSON scalars, the bulk of the leaves; no need to test them with json.dumps
+        return obj
+    elif isinstance(obj, SingleTurnSample):
         # Convert SingleTurnSample to string representation
         return str(obj)
     elif isinstance(obj, dict):
@@ -6,10 +6,25 @@ from agno.tools.python import PythonTools
 import utils.duck
 from app.helpers.load_json_from_file import load_json_from_file
 from dotenv import load_dotenv
+import httpx
 import os
 
 load_dotenv()
 
+BASE_URL = os.getenv("OPENROUTER_BASE_URL")
+API_KEY = os.getenv("OPENROUTER_API_KEY")
+
+# One pooled client shared by every agent, so test runs reuse keep-alive
+# connections to OpenRouter instead of opening a new TCP + TLS connection per query.
+# The OpenAI client on top still retries 429 and 5xx responses.
+HTTP_CLIENT = httpx.Client(
+    transport=httpx.HTTPTransport(
+        retries=3,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    ),
+    timeout=httpx.Timeout(300, connect=5),
+)
+
 
 def initialize_agent(data_dir, llm_model_id, tools):
     """Initialize the agent with the necessary tools and configuration
@@ -34,16 +49,13 @@ def initialize_agent(data_dir, llm_model_id, tools):
         semantic_instructions, semantic_model_data
     )
 
-    BASE_URL = os.getenv("OPENROUTER_BASE_URL")
-    API_KEY = os.getenv("OPENROUTER_API_KEY")
-
     data_analyst = Agent(
         instructions=semantic_instructions,
         system_message=standard_system_message,
         tools=tools,
         show_tool_calls=True,
         model=OpenRouter(
-            base_url=BASE_URL, api_key=API_KEY, id=llm_model_id
+            base_url=BASE_URL, api_key=API_KEY, id=llm_model_id, http_client=HTTP_CLIENT
         ),
         tool_choice="auto",
         tool_call_limit=20,
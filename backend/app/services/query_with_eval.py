@@ -6,6 +6,7 @@ import os
 import json
 import re
 import io
+import threading
 import pandas as pd
 from app.helpers.save_query_to_db import save_query_to_db
 from app.helpers.extract_answer import extract_answer_for_evaluation
@@ -19,7 +20,8 @@ from app.conf.websocket import socketio
 
 logger = logging.getLogger(__name__)
 
-def query_with_eval(model_id, number_of_runs=1, max_retries=3, progress_callback=None, test_selection=None):
+def query_with_eval(model_id, number_of_runs=1, max_retries=3, progress_callback=None, test_selection=None,
+                    max_parallel_runs=None):
     """
     Process queries and evaluate them.
     This function is the entry point for running evaluation tests.
@@ -31,6 +33,8 @@ def query_with_eval(model_id, number_of_runs=1, max_retries=3, progress_callback
         max_retries: Maximum number of retries per test
         progress_callback: Optional callback for progress updates
         test_selection: Optional string specifying which tests to run (e.g., "1", "1,3,5", "1-3")
+        max_parallel_runs: Optional number of test runs executed at once
+            (defaults to MAX_PARALLEL_RUNS, capped at MAX_PARALLEL_RUNS_LIMIT)
     
     Returns:
         For API usage: (response_dict, status_code)
@@ -40,7 +44,9 @@ def query_with_eval(model_id, number_of_runs=1, max_retries=3, progress_callback
     
     try:
         # Import here to avoid circular dependencies
-        from app.ragas.scripts.test_run_manager import execute_test_runs
+        from app.ragas.scripts.test_run_manager import (
+            execute_test_runs, MAX_PARALLEL_RUNS, MAX_PARALLEL_RUNS_LIMIT
+        )
         
         # Run the tests - test_data parameter is None so test_run_manager will load cases from JSON
         combined_ragas_results, results_df = execute_test_runs(
@@ -49,7 +55,8 @@ def query_with_eval(model_id, number_of_runs=1, max_retries=3, progress_callback
             max_retries=max_retries,
             progress_callback=progress_callback,
             test_data=None,  # Let test_run_manager load test cases from JSON
-            test_selection=test_selection  # Pass test selection to execute_test_runs
+            test_selection=test_selection,  # Pass test selection to execute_test_runs
+            max_workers=max(1, min(int(max_parallel_runs or MAX_PARALLEL_RUNS), MAX_PARALLEL_RUNS_LIMIT))
         )
         
         # Check if this is being called from the API (look at the call stack)
@@ -141,6 +148,12 @@ def process_query_internal(question: str, source_file: Optional[str] = None, llm
         log_capture = io.StringIO()
         log_handler = logging.StreamHandler(log_capture)
         log_handler.setLevel(logging.INFO)
+
+        # agno_logger is global; only keep records from this thread so concurrent
+        # evaluation runs don't pick up each other's SQL
+        current_thread = threading.get_ident()
+        thread_filter = lambda record: record.thread == current_thread
+        log_handler.addFilter(thread_filter)
         
         # Use the same logger that works in query.py
         agno_logger.addHandler(log_handler)
@@ -148,6 +161,7 @@ def process_query_internal(question: str, source_file: Optional[str] = None, llm
         # Add WebSocket log handler
         websocket_handler = WebSocketLogHandler()
         websocket_handler.setLevel(logging.INFO)
+        websocket_handler.addFilter(thread_filter)
         agno_logger.addHandler(websocket_handler)
         
         # Get the data analyst agent
@@ -0,0 +1,80 @@
+import unittest
+import asyncio
+
+# Compares against the reference implementations, so it needs the evaluation
+# dependencies from requirements.txt (nltk, ragas, rapidfuzz, rouge_score, numba)
+try:
+    from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
+    from ragas.dataset_schema import SingleTurnSample
+    from ragas.metrics import RougeScore, StringPresence
+    from ragas.metrics._string import NonLLMStringSimilarity
+    from app.ragas.custom_metrics.string_metrics import (
+        fast_metrics_batch,
+        BLEU_SCORE,
+        NON_LLM_STRING_SIMILARITY,
+        ROUGE_SCORE,
+        STRING_PRESENT,
+    )
+except ImportError as e:
+    raise unittest.SkipTest(f"string metric dependencies not installed: {e}")
+
+# (reference, response) pairs covering exact, partial, reordered and empty answers
+PAIRS = [
+    ("The total fuel cost was 254186.70 SEK", "The total fuel cost was 254186.70 SEK"),
+    ("Ferry Jupiter consumed 12709.34 liters of fuel in January",
+     "In January the ferry Jupiter used 12709.34 liters"),
+    ("The average speed was 15 km/h", "Speed: 15 km/h on average, measured over all trips"),
+    ("Running ferries were stopped twice", "The ferries ran without stopping"),
+    ("Total passengers: 1024", ""),
+]
+
+
+class TestStringMetrics(unittest.TestCase):
+    """fast_metrics_batch must give the scores the RAGAS string metrics gave."""
+
+    def setUp(self):
+        self.refs = [reference for reference, _ in PAIRS]
+        self.hyps = [response for _, response in PAIRS]
+        self.scores = fast_metrics_batch(self.refs, self.hyps)
+
+    def _ragas_scores(self, metric):
+        return [
+            asyncio.run(metric.single_turn_ascore(SingleTurnSample(reference=reference, response=response)))
+            for reference, response in PAIRS
+        ]
+
+    def assertScoresEqual(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            self.assertAlmostEqual(e, a, places=6, msg=f"pair {i}: {PAIRS[i]}")
+
+    def test_rouge_matches_ragas(self):
+        self.assertScoresEqual(self._ragas_scores(RougeScore()), self.scores[ROUGE_SCORE])
+
+    def test_string_similarity_matches_ragas(self):
+        self.assertScoresEqual(
+            self._ragas_scores(NonLLMStringSimilarity()), self.scores[NON_LLM_STRING_SIMILARITY]
+        )
+
+    def test_string_presence_matches_ragas(self):
+        self.assertScoresEqual(self._ragas_scores(StringPresence()), self.scores[STRING_PRESENT])
+
+    def test_bleu_matches_sentence_bleu(self):
+        # Same scoring as the former custom BleuScore metric
+        smoothing = SmoothingFunction().method1
+        expected = [
+            float(sentence_bleu([reference.split()], response.split(),
+                                weights=(0.25, 0.25, 0.25, 0.25),
+                                smoothing_function=smoothing))
+            if reference and response else 0.0
+            for reference, response in PAIRS
+        ]
+        self.assertScoresEqual(expected, self.scores[BLEU_SCORE])
+
+    def test_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            fast_metrics_batch(["a"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,73 +19,7 @@ SET xmloption = content;
 SET client_min_messages = warning;
 SET row_security = off;
 
---
--- TOC entry 245 (class 1255 OID 50151)
--- Name: refresh_full_query_data(); Type: FUNCTION; Schema: public; Owner: postgres
---
-
--- ***** MODIFIED FUNCTION START *****
-CREATE OR REPLACE FUNCTION public.refresh_full_query_data() RETURNS trigger
-    LANGUAGE plpgsql
-    AS $$
-BEGIN
-    -- Check if the core driving table has any data. If not, exit early.
-    IF NOT EXISTS (SELECT 1 FROM public.query_result LIMIT 1) THEN
-        RAISE NOTICE 'Trigger % on table %: Skipping refresh of full_query_data as query_result table appears empty.', TG_NAME, TG_TABLE_NAME;
-        RETURN NULL; -- Exit without attempting refresh
-    END IF;
-
-    -- If data exists, proceed with the refresh
-    RAISE NOTICE 'Trigger % on table %: Refreshing materialized view full_query_data.', TG_NAME, TG_TABLE_NAME;
-    REFRESH MATERIALIZED VIEW public.full_query_data;
-    RETURN NULL; -- Important for AFTER triggers
-END;
-$$;
--- ***** MODIFIED FUNCTION END *****
-
-
-ALTER FUNCTION public.refresh_full_query_data() OWNER TO postgres;
-
---
--- TOC entry 246 (class 1255 OID 50925)
--- Name: refresh_model_performance_metrics(); Type: FUNCTION; Schema: public; Owner: postgres
---
-
--- ***** MODIFIED FUNCTION START *****
-CREATE OR REPLACE FUNCTION public.refresh_model_performance_metrics() RETURNS trigger
-    LANGUAGE plpgsql
-    AS $$
-BEGIN
-    -- Check if the core driving table has any data. If not, exit early.
-    -- We check query_result as model performance metrics depend on evaluated queries.
-    IF NOT EXISTS (SELECT 1 FROM public.query_result LIMIT 1) THEN
-        RAISE NOTICE 'Trigger % on table %: Skipping refresh of model_performance_metrics as query_result table appears empty.', TG_NAME, TG_TABLE_NAME;
-        RETURN NULL; -- Exit without attempting refresh
-    END IF;
-
-    -- If data exists, proceed with the refresh attempts
-    RAISE NOTICE 'Trigger % on table %: Attempting concurrent refresh of materialized view model_performance_metrics.', TG_NAME, TG_TABLE_NAME;
-    BEGIN
-        REFRESH MATERIALIZED VIEW CONCURRENTLY public.model_performance_metrics;
-        RAISE NOTICE 'Trigger % on table %: Concurrent refresh successful.', TG_NAME, TG_TABLE_NAME;
-    EXCEPTION WHEN OTHERS THEN
-        RAISE WARNING 'Trigger % on table %: Could not refresh materialized view model_performance_metrics concurrently: %', TG_NAME, TG_TABLE_NAME, SQLERRM;
-        BEGIN
-            RAISE NOTICE 'Trigger % on table %: Attempting non-concurrent refresh of materialized view model_performance_metrics.', TG_NAME, TG_TABLE_NAME;
-            REFRESH MATERIALIZED VIEW public.model_performance_metrics;
-             RAISE NOTICE 'Trigger % on table %: Non-concurrent refresh successful.', TG_NAME, TG_TABLE_NAME;
-        EXCEPTION WHEN OTHERS THEN
-            RAISE WARNING 'Trigger % on table %: Could not refresh materialized view model_performance_metrics (non-concurrently): %', TG_NAME, TG_TABLE_NAME, SQLERRM;
-        END;
-    END;
-
-    RETURN NULL; -- Important for AFTER triggers
-END;
-$$;
--- ***** MODIFIED FUNCTION END *****
-
-
-ALTER FUNCTION public.refresh_model_performance_metrics() OWNER TO postgres;
+
 
 SET default_tablespace = '';
 
@@ -483,83 +417,46 @@ CREATE INDEX idx_full_query_data_timestamp ON public.full_query_data USING btree
 
 
 --
--- TOC entry 3276 (class 1259 OID 50924)
--- Name: model_performance_metrics_idx; Type: INDEX; Schema: public; Owner: postgres
---
-
-CREATE UNIQUE INDEX model_performance_metrics_idx ON public.model_performance_metrics USING btree (model_id);
-
-
---
--- TOC entry 3286 (class 2620 OID 50154)
--- Name: evaluation_metrics refresh_full_query_data_trigger_em; Type: TRIGGER; Schema: public; Owner: postgres
---
-
-CREATE TRIGGER refresh_full_query_data_trigger_em AFTER INSERT OR DELETE OR UPDATE ON public.evaluation_metrics FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_full_query_data();
-
-
---
--- TOC entry 3281 (class 2620 OID 50155)
--- Name: llm_models refresh_full_query_data_trigger_lm; Type: TRIGGER; Schema: public; Owner: postgres
---
-
-CREATE TRIGGER refresh_full_query_data_trigger_lm AFTER INSERT OR DELETE OR UPDATE ON public.llm_models FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_full_query_data();
-
-
---
--- TOC entry 3284 (class 2620 OID 50152)
--- Name: query_evaluation refresh_full_query_data_trigger_qe; Type: TRIGGER; Schema: public; Owner: postgres
---
-
-CREATE TRIGGER refresh_full_query_data_trigger_qe AFTER INSERT OR DELETE OR UPDATE ON public.query_evaluation FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_full_query_data();
-
-
---
--- TOC entry 3283 (class 2620 OID 50153)
--- Name: query_result refresh_full_query_data_trigger_qr; Type: TRIGGER; Schema: public; Owner: postgres
+-- Name: idx_full_query_data_unique; Type: INDEX; Schema: public; Owner: postgres
 --
 
-CREATE TRIGGER refresh_full_query_data_trigger_qr AFTER INSERT OR DELETE OR UPDATE ON public.query_result FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_full_query_data();
+CREATE UNIQUE INDEX idx_full_query_data_unique ON public.full_query_data USING btree (evaluation_metric_id, token_usage_id);
 
 
 --
--- TOC entry 3288 (class 2620 OID 50156)
--- Name: token_usage refresh_full_query_data_trigger_tu; Type: TRIGGER; Schema: public; Owner: postgres
+-- TOC entry 3276 (class 1259 OID 50924)
+-- Name: model_performance_metrics_idx; Type: INDEX; Schema: public; Owner: postgres
 --
 
-CREATE TRIGGER refresh_full_query_data_trigger_tu AFTER INSERT OR DELETE OR UPDATE ON public.token_usage FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_full_query_data();
+CREATE UNIQUE INDEX model_performance_metrics_idx ON public.model_performance_metrics USING btree (model_id);
 
 
 --
--- TOC entry 3287 (class 2620 OID 50928)
--- Name: evaluation_metrics refresh_model_performance_metrics_on_evaluation_metrics; Type: TRIGGER; Schema: public; Owner: postgres
+-- Name: idx_query_result_timestamp; Type: INDEX; Schema: public; Owner: postgres
 --
 
-CREATE TRIGGER refresh_model_performance_metrics_on_evaluation_metrics AFTER INSERT OR DELETE OR UPDATE ON public.evaluation_metrics FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_model_performance_metrics();
+CREATE INDEX idx_query_result_timestamp ON public.query_result USING btree ("timestamp");
 
 
 --
--- TOC entry 3282 (class 2620 OID 50927)
--- Name: llm_models refresh_model_performance_metrics_on_llm_models; Type: TRIGGER; Schema: public; Owner: postgres
+-- Name: idx_query_result_llm_model_id_timestamp; Type: INDEX; Schema: public; Owner: postgres
 --
 
-CREATE TRIGGER refresh_model_performance_metrics_on_llm_models AFTER INSERT OR DELETE OR UPDATE ON public.llm_models FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_model_performance_metrics();
+CREATE INDEX idx_query_result_llm_model_id_timestamp ON public.query_result USING btree (llm_model_id, "timestamp");
 
 
 --
--- TOC entry 3285 (class 2620 OID 50926)
--- Name: query_evaluation refresh_model_performance_metrics_on_query_evaluation; Type: TRIGGER; Schema: public; Owner: postgres
+-- Name: idx_query_evaluation_query_result_id; Type: INDEX; Schema: public; Owner: postgres
 --
 
-CREATE TRIGGER refresh_model_performance_metrics_on_query_evaluation AFTER INSERT OR DELETE OR UPDATE ON public.query_evaluation FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_model_performance_metrics();
+CREATE INDEX idx_query_evaluation_query_result_id ON public.query_evaluation USING btree (query_result_id);
 
 
 --
--- TOC entry 3289 (class 2620 OID 50929)
--- Name: token_usage refresh_model_performance_metrics_on_token_usage; Type: TRIGGER; Schema: public; Owner: postgres
+-- Name: idx_token_usage_query_result_id; Type: INDEX; Schema: public; Owner: postgres
 --
 
-CREATE TRIGGER refresh_model_performance_metrics_on_token_usage AFTER INSERT OR DELETE OR UPDATE ON public.token_usage FOR EACH STATEMENT EXECUTE FUNCTION public.refresh_model_performance_metrics();
+CREATE INDEX idx_token_usage_query_result_id ON public.token_usage USING btree (query_result_id);
 
 
 --
@@ -52,38 +52,5 @@ WITH DATA;
 DROP INDEX IF EXISTS model_performance_metrics_idx;
 CREATE UNIQUE INDEX model_performance_metrics_idx ON model_performance_metrics (model_id);
 
-CREATE OR REPLACE FUNCTION refresh_model_performance_metrics()
-RETURNS TRIGGER AS $$
-BEGIN
-    REFRESH MATERIALIZED VIEW CONCURRENTLY model_performance_metrics;
-    RETURN NULL;
-EXCEPTION WHEN OTHERS THEN
-    RAISE WARNING 'Could not refresh materialized view model_performance_metrics concurrently: %', SQLERRM;
-    BEGIN
-        REFRESH MATERIALIZED VIEW model_performance_metrics;
-    EXCEPTION WHEN OTHERS THEN
-        RAISE WARNING 'Could not refresh materialized view model_performance_metrics: %', SQLERRM;
-    END;
-    RETURN NULL;
-END;
-$$ LANGUAGE plpgsql;
-
-CREATE TRIGGER refresh_model_performance_metrics_on_query_evaluation
-AFTER INSERT OR UPDATE OR DELETE ON query_evaluation
-FOR EACH STATEMENT
-EXECUTE FUNCTION refresh_model_performance_metrics();
-
-CREATE TRIGGER refresh_model_performance_metrics_on_llm_models
-AFTER INSERT OR UPDATE OR DELETE ON llm_models
-FOR EACH STATEMENT
-EXECUTE FUNCTION refresh_model_performance_metrics();
-
-CREATE TRIGGER refresh_model_performance_metrics_on_evaluation_metrics
-AFTER INSERT OR UPDATE OR DELETE ON evaluation_metrics
-FOR EACH STATEMENT
-EXECUTE FUNCTION refresh_model_performance_metrics();
-
-CREATE TRIGGER refresh_model_performance_metrics_on_token_usage
-AFTER INSERT OR UPDATE OR DELETE ON public.token_usage
-FOR EACH STATEMENT
-EXECUTE FUNCTION refresh_model_performance_metrics();
\ No newline at end of file
+-- Refreshed by the backend when the view is read after new results were saved
+-- (app/helpers/materialized_views.py), not by per-statement triggers
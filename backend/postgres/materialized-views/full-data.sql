@@ -15,7 +15,7 @@ SELECT
     qr.direct_response,
     qr.full_response,
     qr.sql_queries,
-    qr.test_no
+    qr.test_no,
     qr."timestamp" AS query_timestamp,
     em.id AS evaluation_metric_id,
     em.factual_correctness,
@@ -43,38 +43,10 @@ LEFT JOIN -- Use LEFT JOIN in case some query results don't have token usage yet
     public.token_usage tu ON qr.id = tu.query_result_id
 WITH DATA;
 
-CREATE OR REPLACE FUNCTION refresh_full_query_data()
-RETURNS TRIGGER AS $$
-BEGIN
-    REFRESH MATERIALIZED VIEW full_query_data;
-    RETURN NULL;
-END;
-$$ LANGUAGE plpgsql;
-
-CREATE TRIGGER refresh_full_query_data_trigger_qe
-AFTER INSERT OR UPDATE OR DELETE ON public.query_evaluation
-FOR EACH STATEMENT
-EXECUTE FUNCTION refresh_full_query_data();
-
-CREATE TRIGGER refresh_full_query_data_trigger_qr
-AFTER INSERT OR UPDATE OR DELETE ON public.query_result
-FOR EACH STATEMENT
-EXECUTE FUNCTION refresh_full_query_data();
-
-CREATE TRIGGER refresh_full_query_data_trigger_em
-AFTER INSERT OR UPDATE OR DELETE ON public.evaluation_metrics
-FOR EACH STATEMENT
-EXECUTE FUNCTION refresh_full_query_data();
-
-CREATE TRIGGER refresh_full_query_data_trigger_lm
-AFTER INSERT OR UPDATE OR DELETE ON public.llm_models
-FOR EACH STATEMENT
-EXECUTE FUNCTION refresh_full_query_data();
-
-CREATE TRIGGER refresh_full_query_data_trigger_tu
-AFTER INSERT OR UPDATE OR DELETE ON public.token_usage
-FOR EACH STATEMENT
-EXECUTE FUNCTION refresh_full_query_data();
+-- Refreshed by the backend when the view is read after new results were saved
+-- (app/helpers/materialized_views.py), not by per-statement triggers
 
 DROP INDEX IF EXISTS idx_full_query_data_id;
-CREATE INDEX idx_full_query_data_timestamp ON full_query_data (query_timestamp);
\ No newline at end of file
+CREATE INDEX idx_full_query_data_timestamp ON full_query_data (query_timestamp);
+-- One row per evaluation (and token usage row); lets the view be refreshed CONCURRENTLY
+CREATE UNIQUE INDEX idx_full_query_data_unique ON full_query_data (evaluation_metric_id, token_usage_id);
\ No newline at end of file
@@ -6,16 +6,31 @@ Uses the local backend API to run evaluation tests
 
 import argparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import sys
 from typing import Optional
 
+# One session for all calls so the connection to the backend is reused.
+# Retry only covers connection errors and idempotent requests: a POST to
+# /api/evaluate is never re-sent, since that would start a second evaluation
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
 def run_evaluation_via_api(
     model_id: str,
     number_of_runs: int = 1,
     max_retries: int = 3,
     test_selection: str = None,
-    api_base_url: str = "http://localhost:5001"
+    api_base_url: str = "http://localhost:5001",
+    max_parallel_runs: int = None
 ) -> dict:
     """Run evaluation tests via the API endpoint"""
     
@@ -25,6 +40,8 @@ def run_evaluation_via_api(
     print(f"   Max retries: {max_retries}")
     if test_selection:
         print(f"   Test selection: {test_selection}")
+    if max_parallel_runs:
+        print(f"   Parallel runs: {max_parallel_runs}")
     print(f"   API URL: {api_base_url}/api/evaluate")
     
     # Prepare the payload
@@ -38,15 +55,18 @@ def run_evaluation_via_api(
     if test_selection:
         payload["test_selection"] = test_selection
     
+    if max_parallel_runs:
+        payload["max_parallel_runs"] = max_parallel_runs
+    
     print(f"\n📤 Sending payload: {json.dumps(payload, indent=2)}")
     
     try:
         # Make the API request
-        response = requests.post(
+        response = _SESSION.post(
             f"{api_base_url}/api/evaluate",
             json=payload,
             headers={"Content-Type": "application/json"},
-            timeout=300  # 5 minute timeout
+            timeout=(5, 300)  # 5 second connect, 5 minute read timeout
         )
         
         print(f"\n📥 Response status: {response.status_code}")
@@ -153,7 +173,7 @@ def list_available_models(api_base_url: str = "http://localhost:5001"):
     # We can check via the test endpoint or make a simple query
     try:
         # Test if backend is running
-        response = requests.get(f"{api_base_url}/api/test", timeout=10)
+        response = _SESSION.get(f"{api_base_url}/api/test", timeout=10)
         if response.status_code == 200:
             print("✅ Backend is running")
             print("\n📋 Suggested models to try:")
@@ -178,6 +198,7 @@ Examples:
   python run_evaluation_api.py --model "openai/gpt-4o-2024-11-20"
   python run_evaluation_api.py --model "google/gemini-2.5-flash-preview" --runs 2
   python run_evaluation_api.py --model "anthropic/claude-3.7-sonnet" --retries 5
+  python run_evaluation_api.py --model "openai/gpt-4o-2024-11-20" --parallel 10
   python run_evaluation_api.py --list-models
         """
     )
@@ -209,6 +230,12 @@ Examples:
         help="Maximum retry attempts (default: 3)"
     )
     
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        help="Test runs executed at once (default: the backend's MAX_PARALLEL_RUNS)"
+    )
+    
     parser.add_argument(
         "--api-url",
         type=str,
@@ -234,7 +261,8 @@ Examples:
         number_of_runs=args.runs,
         max_retries=args.retries,
         test_selection=args.tests,
-        api_base_url=args.api_url
+        api_base_url=args.api_url,
+        max_parallel_runs=args.parallel
     )
     
     # Display results
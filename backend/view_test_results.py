@@ -5,7 +5,7 @@ Test Results Viewer - View evaluation results from PostgreSQL database
 
 import argparse
 import os
-import pandas as pd
+from decimal import Decimal
 import psycopg2
 from dotenv import load_dotenv
 from tabulate import tabulate
@@ -79,13 +79,7 @@ def get_recent_results(limit=20):
         """, (limit,))
         
         columns = [desc[0] for desc in cursor.description]
-        results = cursor.fetchall()
-        
-        if not results:
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(results, columns=columns)
-        return df
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 def get_model_performance_summary():
     """Get aggregated performance metrics by model"""
@@ -111,13 +105,7 @@ def get_model_performance_summary():
         """)
         
         columns = [desc[0] for desc in cursor.description]
-        results = cursor.fetchall()
-        
-        if not results:
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(results, columns=columns)
-        return df
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 def get_detailed_results(limit=10):
     """Get detailed results including query text and responses"""
@@ -148,13 +136,7 @@ def get_detailed_results(limit=10):
         """, (limit,))
         
         columns = [desc[0] for desc in cursor.description]
-        results = cursor.fetchall()
-        
-        if not results:
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(results, columns=columns)
-        return df
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 def get_model_results(model_name, limit=20):
     """Get results for a specific model"""
@@ -182,13 +164,7 @@ def get_model_results(model_name, limit=20):
         """, (model_name, limit))
         
         columns = [desc[0] for desc in cursor.description]
-        results = cursor.fetchall()
-        
-        if not results:
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(results, columns=columns)
-        return df
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 def get_available_models():
     """Get list of available models"""
@@ -229,55 +205,54 @@ def get_test_statistics():
         columns = [desc[0] for desc in cursor.description]
         return dict(zip(columns, result))
 
-def display_results_table(df, title="Results"):
+def display_results_table(rows, title="Results"):
     """Display results in a formatted table"""
-    if df.empty:
+    if not rows:
         print(f"❌ No results found")
         return
         
-    print(f"\n📊 {title} ({len(df)} entries):")
+    print(f"\n📊 {title} ({len(rows)} entries):")
     print("=" * 80)
     
-    # Format numeric columns to 3 decimal places
-    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
-    for col in numeric_cols:
-        if col not in ['query_id', 'test_no', 'total_tokens', 'prompt_tokens', 'completion_tokens']:
-            df[col] = df[col].round(3)
-    
+    # Format numeric values to 3 decimal places
+    rows = [
+        {key: round(value, 3) if isinstance(value, (float, Decimal)) else value for key, value in row.items()}
+        for row in rows
+    ]
+
     # Reorder columns to show test_no first if present
-    if 'test_no' in df.columns:
-        cols = ['test_no'] + [c for c in df.columns if c != 'test_no']
-        df = df[cols]
-    print(tabulate(df, headers='keys', tablefmt='grid', showindex=False))
+    if 'test_no' in rows[0]:
+        rows = [{'test_no': row['test_no'], **row} for row in rows]
+    print(tabulate(rows, headers='keys', tablefmt='grid'))
 
-def display_detailed_results(df):
+def display_detailed_results(rows):
     """Display detailed results with full text"""
-    if df.empty:
+    if not rows:
         print("❌ No detailed results found")
         return
         
-    print(f"\n📋 Detailed Results ({len(df)} entries):")
+    print(f"\n📋 Detailed Results ({len(rows)} entries):")
     print("=" * 80)
     
-    for _, row in df.iterrows():
-        test_no_str = f" | Test No: {row['test_no']}" if 'test_no' in row and pd.notna(row['test_no']) else ""
+    for row in rows:
+        test_no_str = f" | Test No: {row['test_no']}" if row.get('test_no') is not None else ""
         print(f"\n🔍 Query ID: {row['query_id']} | Model: {row['model_name']}{test_no_str}")
         print(f"⏰ Timestamp: {row['timestamp']}")
         print(f"\n📝 Query: {row['query_text'][:200]}{'...' if len(str(row['query_text'])) > 200 else ''}")
         print(f"\n💬 Response: {row['response_text'][:300]}{'...' if len(str(row['response_text'])) > 300 else ''}")
         
         # Display tool calls if available
-        if 'tool_calls' in row and pd.notna(row['tool_calls']) and row['tool_calls']:
+        if row.get('tool_calls'):
             print(f"\n🔧 Tools Used: {row['tool_calls']}")
         else:
             print(f"\n🔧 Tools Used: None")
         
         print(f"\n📊 Metrics:")
-        print(f"   • Factual Correctness: {row['factual_correctness']:.3f}" if pd.notna(row['factual_correctness']) else "   • Factual Correctness: N/A")
-        print(f"   • Semantic Similarity: {row['semantic_similarity']:.3f}" if pd.notna(row['semantic_similarity']) else "   • Semantic Similarity: N/A")
-        print(f"   • Context Recall: {row['context_recall']:.3f}" if pd.notna(row['context_recall']) else "   • Context Recall: N/A")
-        print(f"   • Faithfulness: {row['faithfulness']:.3f}" if pd.notna(row['faithfulness']) else "   • Faithfulness: N/A")
-        print(f"   • Total Tokens: {row['total_tokens']}" if pd.notna(row['total_tokens']) else "   • Total Tokens: N/A")
+        print(f"   • Factual Correctness: {row['factual_correctness']:.3f}" if row['factual_correctness'] is not None else "   • Factual Correctness: N/A")
+        print(f"   • Semantic Similarity: {row['semantic_similarity']:.3f}" if row['semantic_similarity'] is not None else "   • Semantic Similarity: N/A")
+        print(f"   • Context Recall: {row['context_recall']:.3f}" if row['context_recall'] is not None else "   • Context Recall: N/A")
+        print(f"   • Faithfulness: {row['faithfulness']:.3f}" if row['faithfulness'] is not None else "   • Faithfulness: N/A")
+        print(f"   • Total Tokens: {row['total_tokens']}" if row['total_tokens'] is not None else "   • Total Tokens: N/A")
         
         print("-" * 60)
 
@@ -343,19 +318,19 @@ Examples:
         
         if args.summary:
             print("🔍 Loading model performance summary...")
-            df = get_model_performance_summary()
-            display_results_table(df, "Model Performance Summary")
+            rows = get_model_performance_summary()
+            display_results_table(rows, "Model Performance Summary")
             
         elif args.detailed:
             print("🔍 Loading detailed results...")
-            df = get_detailed_results(args.limit)
-            display_detailed_results(df)
+            rows = get_detailed_results(args.limit)
+            display_detailed_results(rows)
             
         elif args.model:
             print(f"🔍 Loading results for model: {args.model}...")
-            df = get_model_results(args.model, args.limit)
-            if not df.empty:
-                display_results_table(df, f"Results for {args.model}")
+            rows = get_model_results(args.model, args.limit)
+            if rows:
+                display_results_table(rows, f"Results for {args.model}")
             else:
                 print(f"❌ No results found for model: {args.model}")
                 print("\n💡 Available models:")
@@ -365,24 +340,25 @@ Examples:
             
         else:
             print("🔍 Loading recent test results...")
-            df = get_recent_results(args.limit)
-            display_results_table(df, "Recent Test Results")
+            rows = get_recent_results(args.limit)
+            display_results_table(rows, "Recent Test Results")
             
-            if not df.empty:
+            if rows:
                 # Show quick summary
                 print(f"\n📈 Quick Summary:")
-                print(f"   Models tested: {df['model_name'].nunique()}")
+                print(f"   Models tested: {len({row['model_name'] for row in rows})}")
                 
                 # Calculate averages for non-null values
                 numeric_cols = ['factual_correctness', 'semantic_similarity', 'context_recall', 'faithfulness']
                 for col in numeric_cols:
-                    if col in df.columns:
-                        avg_val = df[col].mean()
-                        if pd.notna(avg_val):
-                            print(f"   Average {col.replace('_', ' ')}: {avg_val:.3f}")
+                    values = [row[col] for row in rows if row.get(col) is not None]
+                    if values:
+                        avg_val = sum(values) / len(values)
+                        print(f"   Average {col.replace('_', ' ')}: {avg_val:.3f}")
                 
-                if 'timestamp' in df.columns:
-                    print(f"   Time range: {df['timestamp'].min()} to {df['timestamp'].max()}")
+                timestamps = [row['timestamp'] for row in rows if row.get('timestamp') is not None]
+                if timestamps:
+                    print(f"   Time range: {min(timestamps)} to {max(timestamps)}")
         
         if not (args.summary or args.detailed or args.stats or args.list_models):
             print("\n💡 Tip: Use --detailed for full query text and responses")
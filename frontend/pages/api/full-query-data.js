@@ -4,7 +4,9 @@ const SERVER_URL = process.env.NEXT_PUBLIC_SERVER_URL;
 
 export default async function handler(req, res) {
   try {
-    const response = await fetch(`${SERVER_URL}/api/full-query-data`);
+    // Pass paging parameters (limit, offset) through to the backend
+    const params = new URLSearchParams(req.query).toString();
+    const response = await fetch(`${SERVER_URL}/api/full-query-data${params ? `?${params}` : ''}`);
     
     if (!response.ok) {
       throw new Error(`Error fetching query history: ${response.statusText}`);